@@ -173,14 +173,15 @@ REPO_DIR.mkdir(parents=True, exist_ok=True)
 if _LLM_BACKEND == "antigravity":
     # Store tokens on Drive so they survive Colab reboots
     os.environ["OUROBOROS_TOKEN_DIR"] = str(DRIVE_ROOT / "state")
-    from ouroboros.antigravity_auth import is_logged_in, login_manual
+    from ouroboros.antigravity_auth import get_email, is_logged_in, login_manual
     if not is_logged_in():
         print("\n" + "=" * 60)
         print("🔑 ANTIGRAVITY: Google OAuth login required (one-time setup)")
         print("=" * 60)
         try:
             result = login_manual()
-            print(f"\n✅ Logged in as {result.get('email', '?')} (project: {result.get('project_id', '?')})")
+            # login no longer fetches the email; get_email() does it once and stores it
+            print(f"\n✅ Logged in as {get_email() or '?'} (project: {result.get('project_id', '?')})")
         except Exception as e:
             print(f"\n⚠️ Antigravity login failed: {e}")
             print("Falling back to OpenRouter backend.")
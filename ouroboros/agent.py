@@ -447,8 +447,10 @@ class OuroborosAgent:
             self._busy = False
             # Clean up browser if it was used during this task
             try:
+                from ouroboros.loop import run_on_stateful_thread
                 from ouroboros.tools.browser import cleanup_browser
-                cleanup_browser(self.tools._ctx)
+                # Must run on the thread that owns the Playwright greenlet
+                run_on_stateful_thread(cleanup_browser, self.tools._ctx, timeout=30)
             except Exception:
                 log.debug("Failed to cleanup browser", exc_info=True)
                 pass
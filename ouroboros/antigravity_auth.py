@@ -9,18 +9,24 @@ Flow:
 
 from __future__ import annotations
 
+import atexit
 import base64
 import hashlib
 import json
 import logging
 import os
 import secrets
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 from urllib.parse import urlencode, urlparse, parse_qs
 
+if TYPE_CHECKING:
+    import requests
+
 log = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -40,6 +46,7 @@ SCOPES = [
 
 REDIRECT_URI = "http://localhost:51121/oauth-callback"
 CALLBACK_PORT = 51121
+CALLBACK_TIMEOUT_SEC = 300
 
 TOKEN_ENDPOINT = "https://oauth2.googleapis.com/token"
 AUTH_ENDPOINT = "https://accounts.google.com/o/oauth2/v2/auth"
@@ -53,9 +60,31 @@ ENDPOINTS_LOAD = [
 
 DEFAULT_PROJECT_ID = "rising-fact-p41fc"
 
+# Static parts of loadCodeAssist/onboardUser requests (Authorization added per call).
+_CLOUDCODE_HEADERS = {
+    "Content-Type": "application/json",
+    "X-Goog-Api-Client": "google-cloud-sdk vscode_cloudshelleditor/0.1",
+    "Client-Metadata": '{"ideType":"ANTIGRAVITY","platform":"MACOS","pluginType":"GEMINI"}',
+}
+# Note: "platform" must NOT be in body metadata (protobuf enum rejects strings).
+# It's only used in the Client-Metadata header as free-form JSON.
+_CLIENT_METADATA = {
+    "ideType": "ANTIGRAVITY",
+    "pluginType": "GEMINI",
+}
+_LOAD_CODE_ASSIST_BODY = json.dumps({"metadata": _CLIENT_METADATA}).encode("utf-8")
+
 _TOKEN_DIR = Path(os.environ.get("OUROBOROS_TOKEN_DIR", "~/.ouroboros")).expanduser()
 _TOKEN_FILE = _TOKEN_DIR / "antigravity_tokens.json"
 
+# Tokens this close to expiry are refreshed in the background while still served.
+_STALE_SECONDS = 300
+_REFRESH_LOCK = threading.Lock()
+_REFRESH_IN_FLIGHT = False
+# (access_token, expires_at) for this process — swapped as one tuple so
+# threads never see a token paired with another token's expiry.
+_ACCESS: Tuple[str, float] = ("", 0.0)
+
 
 # ---------------------------------------------------------------------------
 # PKCE helpers
@@ -63,7 +92,8 @@ _TOKEN_FILE = _TOKEN_DIR / "antigravity_tokens.json"
 
 def _generate_pkce() -> Tuple[str, str]:
     """Generate PKCE code_verifier and code_challenge (S256)."""
-    verifier = secrets.token_urlsafe(64)
+    # 48 random bytes → 64 base64url chars (RFC 7636 allows 43-128)
+    verifier = base64.urlsafe_b64encode(secrets.token_bytes(48)).rstrip(b"=").decode("ascii")
     digest = hashlib.sha256(verifier.encode("ascii")).digest()
     challenge = base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
     return verifier, challenge
@@ -77,9 +107,8 @@ def _encode_state(verifier: str, project_id: str = "") -> str:
 
 def _decode_state(state: str) -> Tuple[str, str]:
     """Decode state back to (verifier, project_id)."""
-    padded = state + "=" * ((4 - len(state) % 4) % 4)
-    normalized = padded.replace("-", "+").replace("_", "/")
-    data = json.loads(base64.b64decode(normalized).decode("utf-8"))
+    padded = state + "=" * (-len(state) % 4)
+    data = json.loads(base64.urlsafe_b64decode(padded))
     return data["verifier"], data.get("projectId", "")
 
 
@@ -87,22 +116,84 @@ def _decode_state(state: str) -> Tuple[str, str]:
 # Token storage
 # ---------------------------------------------------------------------------
 
+# Parsed token file, keyed by its mtime so an external re-login is picked up.
+_CACHE: Optional[Dict[str, Any]] = None
+_CACHE_MTIME: int = 0
+# Set when _CACHE holds changes not yet written to _TOKEN_FILE.
+_DIRTY = False
+
+
+def _read_cached() -> Dict[str, Any]:
+    """Return the shared parsed token dict (do not mutate). A missing file costs one stat()."""
+    global _CACHE, _CACHE_MTIME, _DIRTY
+    try:
+        mtime = _TOKEN_FILE.stat().st_mtime_ns
+    except OSError:
+        return {}
+    if _CACHE is not None and mtime == _CACHE_MTIME:
+        return _CACHE
+    try:
+        data = json.loads(_TOKEN_FILE.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return {}
+    # Another process rewrote the file; its contents supersede anything staged.
+    _CACHE, _CACHE_MTIME, _DIRTY = data, mtime, False
+    return data
+
+
 def _load_stored() -> Dict[str, Any]:
-    if _TOKEN_FILE.exists():
-        try:
-            return json.loads(_TOKEN_FILE.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {}
+    return dict(_read_cached())
 
 
 def _save_stored(data: Dict[str, Any]) -> None:
+    global _CACHE, _CACHE_MTIME, _DIRTY
     _TOKEN_DIR.mkdir(parents=True, exist_ok=True)
-    _TOKEN_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # Write a private temp file and rename it over the original: readers never
+    # see a truncated file and the tokens are never briefly world-readable.
+    tmp = _TOKEN_FILE.with_name(f".{_TOKEN_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0)
+    fd = os.open(str(tmp), flags, 0o600)
     try:
-        _TOKEN_FILE.chmod(0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, _TOKEN_FILE)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _DIRTY = False
+    try:
+        _CACHE, _CACHE_MTIME = dict(data), _TOKEN_FILE.stat().st_mtime_ns
     except OSError:
-        pass
+        _CACHE = None
+
+
+def _stage_stored(data: Dict[str, Any]) -> None:
+    """Update the cached token dict without touching disk; flushed at exit.
+
+    Only for changes that are cheap to lose (a new access_token/expires_at):
+    the next process simply refreshes again.
+    """
+    global _CACHE, _DIRTY
+    if _CACHE is None:
+        _save_stored(data)
+        return
+    _CACHE = dict(data)
+    _DIRTY = True
+
+
+def _flush_stored() -> None:
+    """Persist staged token changes unless another process rewrote the file."""
+    if not _DIRTY or _CACHE is None:
+        return
+    try:
+        if _TOKEN_FILE.stat().st_mtime_ns != _CACHE_MTIME:
+            return
+        _save_stored(_CACHE)
+    except Exception:
+        log.debug("Failed to flush Antigravity tokens at exit", exc_info=True)
+
+
+atexit.register(_flush_stored)
 
 
 # ---------------------------------------------------------------------------
@@ -132,16 +223,47 @@ def get_auth_url() -> Tuple[str, str]:
 # Token exchange & refresh
 # ---------------------------------------------------------------------------
 
+# requests is imported on first HTTP call only; colab_launcher imports this module
+# just to check is_logged_in().
+_SESSION: Optional["requests.Session"] = None
+
+
+def _session() -> "requests.Session":
+    """Shared requests.Session so OAuth/cloudcode calls reuse TLS connections."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = "google-api-nodejs-client/9.15.1"
+        _SESSION = session
+    return _SESSION
+
+
+def _reset_after_fork() -> None:
+    """Forked workers must not write to the parent's keep-alive sockets.
+
+    The refresh lock and in-flight flag are reset too: a refresh running in
+    the parent at fork time has no thread in the child to release them.
+    """
+    global _SESSION, _REFRESH_LOCK, _REFRESH_IN_FLIGHT
+    _SESSION = None
+    _REFRESH_LOCK = threading.Lock()
+    _REFRESH_IN_FLIGHT = False
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def _http_post_form(url: str, data: Dict[str, str], timeout: int = 15) -> Dict[str, Any]:
     """POST form-urlencoded, return JSON."""
-    import requests
-    resp = requests.post(
+    resp = _session().post(
         url,
         data=data,
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-            "User-Agent": "google-api-nodejs-client/9.15.1",
-        },
+        headers={"Content-Type": "application/x-www-form-urlencoded;charset=UTF-8"},
         timeout=timeout,
     )
     resp.raise_for_status()
@@ -150,6 +272,7 @@ def _http_post_form(url: str, data: Dict[str, str], timeout: int = 15) -> Dict[s
 
 def exchange_code(code: str, verifier: str) -> Dict[str, Any]:
     """Exchange authorization code for tokens."""
+    global _ACCESS
     token_data = _http_post_form(TOKEN_ENDPOINT, {
         "client_id": CLIENT_ID,
         "client_secret": CLIENT_SECRET,
@@ -166,26 +289,25 @@ def exchange_code(code: str, verifier: str) -> Dict[str, Any]:
     if not refresh_token or not access_token:
         raise ValueError(f"Missing tokens in response: {list(token_data.keys())}")
 
-    # Get user email
-    email = _fetch_email(access_token)
-
-    # Get project ID
+    # Email is informational only — resolved lazily by get_email()
     project_id = _fetch_project_id(access_token)
 
     result = {
         "refresh_token": refresh_token,
         "access_token": access_token,
         "expires_at": time.time() + expires_in - 60,  # 60s safety margin
-        "email": email,
+        "email": "",
         "project_id": project_id,
     }
     _save_stored(result)
-    log.info("Antigravity auth: logged in as %s (project: %s)", email, project_id)
+    _ACCESS = (access_token, result["expires_at"])
+    log.info("Antigravity auth: logged in (project: %s)", project_id)
     return result
 
 
 def refresh_access_token(refresh_token: Optional[str] = None) -> str:
     """Refresh access token. Uses stored refresh_token if not provided."""
+    global _ACCESS
     stored = _load_stored()
     rt = refresh_token or stored.get("refresh_token", "")
     if not rt:
@@ -201,24 +323,81 @@ def refresh_access_token(refresh_token: Optional[str] = None) -> str:
     access_token = token_data["access_token"]
     expires_in = int(token_data.get("expires_in", 3600))
 
-    # Update stored tokens
+    # Update stored tokens. A rotated refresh_token must hit disk now; a new
+    # access_token alone lives in memory and is flushed at exit.
     stored["access_token"] = access_token
     stored["expires_at"] = time.time() + expires_in - 60
-    if token_data.get("refresh_token"):
-        stored["refresh_token"] = token_data["refresh_token"]
-    _save_stored(stored)
+    new_rt = token_data.get("refresh_token")
+    if new_rt and new_rt != stored.get("refresh_token"):
+        stored["refresh_token"] = new_rt
+        _save_stored(stored)
+    else:
+        _stage_stored(stored)
+    _ACCESS = (access_token, stored["expires_at"])
 
     return access_token
 
 
+def refresh_rejected_token(rejected: str) -> str:
+    """A new access token after the API rejected ``rejected`` with 401.
+
+    Serialized on _REFRESH_LOCK: when many concurrent calls get a 401 for the
+    same token, the first refreshes and the rest reuse its result.
+    """
+    with _REFRESH_LOCK:
+        token, expires_at = _ACCESS
+        if token and token != rejected and time.time() < expires_at:
+            return token
+        return refresh_access_token()
+
+
+def _background_refresh(refresh_token: str) -> None:
+    global _REFRESH_IN_FLIGHT
+    try:
+        refresh_access_token(refresh_token)
+    except Exception:
+        log.warning("Background token refresh failed", exc_info=True)
+    finally:
+        with _REFRESH_LOCK:
+            _REFRESH_IN_FLIGHT = False
+
+
+def cached_access_token() -> Optional[str]:
+    """The in-memory access token if it is not near expiry, else None. Never blocks."""
+    token, expires_at = _ACCESS
+    if token and time.time() < expires_at - _STALE_SECONDS:
+        return token
+    return None
+
+
 def get_access_token() -> str:
-    """Get a valid access token, refreshing if expired."""
+    """Get a valid access token, refreshing if expired.
+
+    Within _STALE_SECONDS of expiry the current token is still returned and
+    a refresh is started in the background, so callers rarely block on it.
+    """
+    global _REFRESH_IN_FLIGHT, _ACCESS
+    token = cached_access_token()
+    if token:
+        return token
+
     stored = _load_stored()
     if not stored.get("refresh_token"):
         raise RuntimeError("Not logged in. Run antigravity_auth.login() first.")
 
     expires_at = stored.get("expires_at", 0)
-    if stored.get("access_token") and time.time() < expires_at:
+    now = time.time()
+    if stored.get("access_token") and now < expires_at:
+        _ACCESS = (stored["access_token"], expires_at)
+        if now >= expires_at - _STALE_SECONDS:
+            with _REFRESH_LOCK:
+                start = not _REFRESH_IN_FLIGHT
+                _REFRESH_IN_FLIGHT = True
+            if start:
+                threading.Thread(
+                    target=_background_refresh, args=(stored["refresh_token"],),
+                    name="antigravity-token-refresh", daemon=True,
+                ).start()
         return stored["access_token"]
 
     return refresh_access_token(stored["refresh_token"])
@@ -226,8 +405,20 @@ def get_access_token() -> str:
 
 def get_project_id() -> str:
     """Get stored project ID."""
+    return _read_cached().get("project_id", DEFAULT_PROJECT_ID)
+
+
+def get_email() -> str:
+    """Get the account email, fetching and storing it on first use."""
     stored = _load_stored()
-    return stored.get("project_id", DEFAULT_PROJECT_ID)
+    if stored.get("email"):
+        return stored["email"]
+    email = _fetch_email(get_access_token())
+    if email:
+        stored = _load_stored()
+        stored["email"] = email
+        _save_stored(stored)
+    return email
 
 
 # ---------------------------------------------------------------------------
@@ -235,9 +426,8 @@ def get_project_id() -> str:
 # ---------------------------------------------------------------------------
 
 def _fetch_email(access_token: str) -> str:
-    import requests
     try:
-        resp = requests.get(
+        resp = _session().get(
             USERINFO_ENDPOINT,
             headers={"Authorization": f"Bearer {access_token}"},
             timeout=10,
@@ -249,6 +439,49 @@ def _fetch_email(access_token: str) -> str:
     return ""
 
 
+def _managed_project(payload: Optional[Dict[str, Any]]) -> str:
+    """Extract cloudaicompanionProject id from a loadCodeAssist payload."""
+    if not payload:
+        return ""
+    cap = payload.get("cloudaicompanionProject", "")
+    if isinstance(cap, dict):
+        cap = cap.get("id", "")
+    return cap or ""
+
+
+def _load_code_assist(session: "requests.Session", headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """Probe all ENDPOINTS_LOAD concurrently.
+
+    Returns the first payload that names a managed project; otherwise any
+    successful payload (still useful for allowedTiers), or None.
+    """
+    def _probe(endpoint: str) -> Optional[Dict[str, Any]]:
+        resp = session.post(
+            f"{endpoint}/v1internal:loadCodeAssist",
+            headers=headers,
+            data=_LOAD_CODE_ASSIST_BODY,
+            timeout=15,
+        )
+        return resp.json() if resp.ok else None
+
+    fallback = None
+    pool = ThreadPoolExecutor(max_workers=len(ENDPOINTS_LOAD))
+    try:
+        futures = [pool.submit(_probe, endpoint) for endpoint in ENDPOINTS_LOAD]
+        for fut in as_completed(futures):
+            try:
+                payload = fut.result()
+            except Exception:
+                continue
+            if _managed_project(payload):
+                return payload
+            if payload and fallback is None:
+                fallback = payload
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return fallback
+
+
 def _fetch_project_id(access_token: str) -> str:
     """Resolve Antigravity managed project ID via loadCodeAssist + onboardUser.
 
@@ -257,45 +490,15 @@ def _fetch_project_id(access_token: str) -> str:
       2. If none found → auto-provision via onboardUser
       3. Fallback to DEFAULT_PROJECT_ID
     """
-    import requests
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "User-Agent": "google-api-nodejs-client/9.15.1",
-        "X-Goog-Api-Client": "google-cloud-sdk vscode_cloudshelleditor/0.1",
-        "Client-Metadata": '{"ideType":"ANTIGRAVITY","platform":"MACOS","pluginType":"GEMINI"}',
-    }
-    # Note: "platform" must NOT be in body metadata (protobuf enum rejects strings).
-    # It's only used in the Client-Metadata header as free-form JSON.
-    metadata = {
-        "ideType": "ANTIGRAVITY",
-        "pluginType": "GEMINI",
-    }
+    session = _session()
+    headers = {**_CLOUDCODE_HEADERS, "Authorization": f"Bearer {access_token}"}
 
     # Step 1: loadCodeAssist
-    load_payload = None
-    for endpoint in ENDPOINTS_LOAD:
-        try:
-            resp = requests.post(
-                f"{endpoint}/v1internal:loadCodeAssist",
-                headers=headers,
-                json={"metadata": metadata},
-                timeout=15,
-            )
-            if resp.ok:
-                load_payload = resp.json()
-                break
-        except Exception:
-            continue
-
-    if load_payload:
-        # Extract managed project ID
-        cap = load_payload.get("cloudaicompanionProject", "")
-        if isinstance(cap, dict):
-            cap = cap.get("id", "")
-        if cap:
-            log.info("Resolved managed project: %s", cap)
-            return cap
+    load_payload = _load_code_assist(session, headers)
+    cap = _managed_project(load_payload)
+    if cap:
+        log.info("Resolved managed project: %s", cap)
+        return cap
 
     # Step 2: Auto-provision via onboardUser
     log.info("No managed project found — auto-provisioning via onboardUser...")
@@ -316,10 +519,10 @@ def _fetch_project_id(access_token: str) -> str:
     for endpoint in ENDPOINTS_LOAD:
         for attempt in range(10):
             try:
-                resp = requests.post(
+                resp = session.post(
                     f"{endpoint}/v1internal:onboardUser",
                     headers=headers,
-                    json={"tierId": tier_id, "metadata": metadata},
+                    json={"tierId": tier_id, "metadata": _CLIENT_METADATA},
                     timeout=15,
                 )
                 if not resp.ok:
@@ -388,8 +591,16 @@ def login() -> Dict[str, Any]:
     _OAuthCallbackHandler.code = None
     _OAuthCallbackHandler.state = None
     server = HTTPServer(("127.0.0.1", CALLBACK_PORT), _OAuthCallbackHandler)
-    server.handle_request()
-    server.server_close()
+    # Poll in 1s slices so Ctrl-C stays responsive and a closed browser tab
+    # can't wedge the process forever.
+    server.timeout = 1.0
+    try:
+        for _ in range(CALLBACK_TIMEOUT_SEC):
+            server.handle_request()
+            if _OAuthCallbackHandler.code:
+                break
+    finally:
+        server.server_close()
 
     if not _OAuthCallbackHandler.code:
         raise RuntimeError("No authorization code received. Try login_manual().")
@@ -437,5 +648,4 @@ def login_manual() -> Dict[str, Any]:
 
 def is_logged_in() -> bool:
     """Check if we have stored credentials."""
-    stored = _load_stored()
-    return bool(stored.get("refresh_token"))
+    return bool(_read_cached().get("refresh_token"))
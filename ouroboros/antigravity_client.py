@@ -7,39 +7,131 @@ for compatibility with the existing Ouroboros LLMClient interface.
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
+import pathlib
+import random
+import secrets
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from ouroboros.antigravity_auth import (
+    cached_access_token,
     get_access_token,
     get_project_id,
+    refresh_rejected_token,
 )
 from ouroboros.utils import append_jsonl, utc_now_iso
 
+try:
+    import orjson  # optional: 3-10x faster (de)serialization of bodies and tool args
+except ImportError:
+    orjson = None
+
 log = logging.getLogger(__name__)
 
+
+def _json_loads(data: Any) -> Any:
+    """Parse JSON from str/bytes. Errors subclass json.JSONDecodeError either way."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _json_dumps(obj: Any) -> str:
+    return orjson.dumps(obj).decode("utf-8") if orjson is not None else json.dumps(obj)
+
+
+def _json_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 # ---------------------------------------------------------------------------
 # Endpoints & headers
 # ---------------------------------------------------------------------------
 
-ENDPOINTS = [
+ENDPOINTS = (
     "https://daily-cloudcode-pa.sandbox.googleapis.com",
     "https://autopush-cloudcode-pa.sandbox.googleapis.com",
     "https://cloudcode-pa.googleapis.com",
-]
+)
+
+# Endpoint that last returned 200 — tried first next time (warm keep-alive).
+_LAST_GOOD_ENDPOINT: Optional[str] = None
+
+# Full-jitter backoff between endpoints after a 429/5xx.
+_BACKOFF_BASE_SEC = 0.5
+_BACKOFF_MAX_SEC = 8.0
+
+
+def _endpoint_order() -> List[str]:
+    """Last good endpoint first, the rest shuffled so clients don't retry in lockstep."""
+    others = [e for e in ENDPOINTS if e != _LAST_GOOD_ENDPOINT]
+    random.shuffle(others)
+    return [_LAST_GOOD_ENDPOINT] + others if _LAST_GOOD_ENDPOINT in ENDPOINTS else others
+
+
+def _backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(_BACKOFF_BASE_SEC * (2 ** attempt), _BACKOFF_MAX_SEC))
+
+
+def _should_back_off(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def _mark_endpoint_good(endpoint: str) -> None:
+    global _LAST_GOOD_ENDPOINT
+    _LAST_GOOD_ENDPOINT = endpoint
+
+
+_SESSION = None
+
+
+def _session():
+    """Shared requests.Session: keep-alive connections to all ENDPOINTS across chat() calls."""
+    global _SESSION
+    if _SESSION is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0))
+        _SESSION = session
+    return _SESSION
+
+
+def _reset_after_fork() -> None:
+    """Forked workers start with no pooled connections of their own.
+
+    The parent's keep-alive TLS sockets are inherited across fork(); a child
+    writing to them would interleave with the parent's traffic. The diag
+    writer's thread does not survive fork either, so the child makes its own.
+    """
+    global _SESSION, _DIAG_WRITER
+    _SESSION = None
+    _DIAG_WRITER = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+# IMPORTANT: do NOT include x-goog-user-project, X-Goog-Api-Client,
+# or Client-Metadata — they trigger 403 "Cloud Code Private API"
+# permission checks on the managed project.
+_HEADERS_TEMPLATE: Dict[str, str] = {
+    "Content-Type": "application/json",
+    "User-Agent": "antigravity/1.18.3 darwin/arm64",
+}
+
 
 def _get_headers(access_token: str) -> Dict[str, str]:
-    # IMPORTANT: do NOT include x-goog-user-project, X-Goog-Api-Client,
-    # or Client-Metadata — they trigger 403 "Cloud Code Private API"
-    # permission checks on the managed project.
-    return {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-        "User-Agent": "antigravity/1.18.3 darwin/arm64",
-    }
+    headers = _HEADERS_TEMPLATE.copy()
+    headers["Authorization"] = "Bearer " + access_token
+    return headers
 
 # ---------------------------------------------------------------------------
 # Model name mapping → Cloud Code API model names
@@ -82,14 +174,16 @@ def _resolve_model(model: str) -> str:
 # Message conversion: OpenAI → Google GenerativeAI
 # ---------------------------------------------------------------------------
 
-def _resolve_fn_name(messages: List[Dict[str, Any]], tool_call_id: str) -> str:
-    """Look up function name from tool_call_id by scanning assistant messages."""
-    for msg in reversed(messages):
+def _tool_call_names(messages: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Map tool_call_id → function name over all assistant messages (latest wins)."""
+    names: Dict[str, str] = {}
+    for msg in messages:
         if msg.get("role") == "assistant" and msg.get("tool_calls"):
             for tc in msg["tool_calls"]:
-                if tc.get("id") == tool_call_id:
-                    return tc.get("function", {}).get("name", tool_call_id)
-    return tool_call_id
+                tc_id = tc.get("id")
+                if tc_id:
+                    names[tc_id] = tc.get("function", {}).get("name", tc_id)
+    return names
 
 
 def _openai_to_google(
@@ -99,14 +193,22 @@ def _openai_to_google(
     """Convert OpenAI chat messages to Google GenerativeAI request body."""
     system_instruction = None
     contents: List[Dict[str, Any]] = []
+    fn_names: Optional[Dict[str, str]] = None  # built on first unnamed tool result
 
     for msg in messages:
         role = msg.get("role", "user")
         content = msg.get("content", "")
 
+        # Fast path: plain-text user/assistant turns (the bulk of any history)
+        if type(content) is str and (
+            role == "user" or (role == "assistant" and not msg.get("tool_calls"))
+        ):
+            contents.append({"role": "user" if role == "user" else "model", "parts": [{"text": content}]})
+            continue
+
         if role == "system":
             # System messages → systemInstruction
-            text = content if isinstance(content, str) else json.dumps(content)
+            text = content if isinstance(content, str) else _json_dumps(content)
             system_instruction = {"parts": [{"text": text}]}
             continue
 
@@ -121,9 +223,14 @@ def _openai_to_google(
             for idx, tc in enumerate(msg["tool_calls"]):
                 fn = tc.get("function", {})
                 args = fn.get("arguments", "{}")
-                if isinstance(args, str):
+                native = _PARSED_ARGS.get(id(args))
+                # Only trust the side table while "arguments" is still the string
+                # we produced — context compaction rewrites it.
+                if native is not None and native[0] is args:
+                    args = native[1]
+                elif isinstance(args, str):
                     try:
-                        args = json.loads(args)
+                        args = _json_loads(args)
                     except json.JSONDecodeError:
                         args = {"raw": args}
                 fc_part: Dict[str, Any] = {
@@ -151,12 +258,17 @@ def _openai_to_google(
             # the matching tool_call in the preceding assistant message
             name = msg.get("name", "")
             if not name:
-                name = _resolve_fn_name(messages, tool_call_id)
-            text = content if isinstance(content, str) else json.dumps(content)
-            try:
-                response_data = json.loads(text)
-            except (json.JSONDecodeError, TypeError):
-                response_data = {"result": text}
+                if fn_names is None:
+                    fn_names = _tool_call_names(messages)
+                name = fn_names.get(tool_call_id, tool_call_id)
+            if isinstance(content, str):
+                try:
+                    response_data = _json_loads(content)
+                except json.JSONDecodeError:
+                    response_data = {"result": content}
+            else:
+                # Already structured: no dumps→loads round trip
+                response_data = content
             # google.protobuf.Struct requires top-level dict — wrap lists/scalars
             if not isinstance(response_data, dict):
                 response_data = {"result": response_data}
@@ -217,41 +329,75 @@ def _openai_to_google(
     return body
 
 
-def _convert_tools(openai_tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Convert OpenAI tool definitions to Google function declarations."""
-    declarations = []
-    for tool in openai_tools:
-        if tool.get("type") != "function":
-            continue
-        fn = tool.get("function", {})
-        params = fn.get("parameters", {})
+# Converted declarations keyed by id() of the OpenAI "function" dict. Registry
+# schemas are long-lived and never mutated, so the same objects arrive every
+# turn. The entry keeps a reference to the source dict so its id can't be reused.
+_DECLARATION_CACHE: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+_DECLARATION_CACHE_MAX = 512
 
+
+def _function_declaration(fn: Dict[str, Any]) -> Dict[str, Any]:
+    """Google declaration for one OpenAI function schema (cached, do not mutate)."""
+    hit = _DECLARATION_CACHE.get(id(fn))
+    if hit is not None and hit[0] is fn:
+        return hit[1]
+    declaration = {
+        "name": fn.get("name", ""),
+        "description": fn.get("description", ""),
         # Clean schema: remove unsupported keys
-        cleaned = _clean_schema(params)
+        "parameters": _clean_schema(fn.get("parameters", {})),
+    }
+    if len(_DECLARATION_CACHE) >= _DECLARATION_CACHE_MAX:
+        _DECLARATION_CACHE.clear()
+    _DECLARATION_CACHE[id(fn)] = (fn, declaration)
+    return declaration
 
-        declarations.append({
-            "name": fn.get("name", ""),
-            "description": fn.get("description", ""),
-            "parameters": cleaned,
-        })
+
+def _convert_tools(openai_tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert OpenAI tool definitions to Google function declarations."""
+    declarations = [
+        _function_declaration(tool.get("function", {}))
+        for tool in openai_tools
+        if tool.get("type") == "function"
+    ]
 
     if not declarations:
         return []
     return [{"functionDeclarations": declarations}]
 
 
+_UNSUPPORTED_SCHEMA_KEYS = frozenset(("additionalProperties", "default", "$schema"))
+
+
 def _clean_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
-    """Remove keys not supported by Google GenerativeAI (additionalProperties, etc.)."""
-    result = {}
-    for k, v in schema.items():
-        if k in ("additionalProperties", "default", "$schema"):
-            continue
-        if isinstance(v, dict):
-            result[k] = _clean_schema(v)
-        elif isinstance(v, list):
-            result[k] = [_clean_schema(item) if isinstance(item, dict) else item for item in v]
-        else:
-            result[k] = v
+    """Remove keys not supported by Google GenerativeAI (additionalProperties, etc.).
+
+    Iterative: builds the filtered copy in one pass with an explicit stack
+    instead of recursing per nested dict.
+    """
+    result: Dict[str, Any] = {}
+    stack = [(schema, result)]
+    while stack:
+        src, dst = stack.pop()
+        for k, v in src.items():
+            if k in _UNSUPPORTED_SCHEMA_KEYS:
+                continue
+            if isinstance(v, dict):
+                child: Dict[str, Any] = {}
+                stack.append((v, child))
+                dst[k] = child
+            elif isinstance(v, list):
+                items = []
+                for item in v:
+                    if isinstance(item, dict):
+                        child = {}
+                        stack.append((item, child))
+                        items.append(child)
+                    else:
+                        items.append(item)
+                dst[k] = items
+            else:
+                dst[k] = v
     return result
 
 
@@ -259,11 +405,26 @@ def _clean_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
 # Response conversion: Google → OpenAI
 # ---------------------------------------------------------------------------
 
+# Parsed functionCall args keyed by id() of the "arguments" string we built
+# from them, so the next request skips a loads of our own dumps. Kept out of
+# the tool_call dicts: those are copied by context compaction and persisted.
+# Each entry holds its string, so the id can't be reused while it is cached.
+_PARSED_ARGS: Dict[int, Tuple[str, Any]] = {}
+_PARSED_ARGS_MAX = 256
+
+
+def _remember_parsed_args(arguments: str, args: Any) -> None:
+    if len(_PARSED_ARGS) >= _PARSED_ARGS_MAX:
+        _PARSED_ARGS.clear()
+    _PARSED_ARGS[id(arguments)] = (arguments, args)
+
+
 def _google_to_openai_message(response: Dict[str, Any]) -> Dict[str, Any]:
     """Convert Google GenerativeAI response to OpenAI message dict."""
     candidates = response.get("candidates", [])
     if not candidates:
-        log.warning("Antigravity: no candidates in response: %s", json.dumps(response)[:500])
+        if log.isEnabledFor(logging.WARNING):
+            log.warning("Antigravity: no candidates in response: %s", _json_dumps(response)[:500])
         return {"role": "assistant", "content": None}
 
     candidate = candidates[0]
@@ -282,12 +443,15 @@ def _google_to_openai_message(response: Dict[str, Any]) -> Dict[str, Any]:
             text_parts.append(part["text"])
         elif "functionCall" in part:
             fc = part["functionCall"]
+            fc_args = fc.get("args", {})
+            arguments = _json_dumps(fc_args)
+            _remember_parsed_args(arguments, fc_args)
             tc_entry: Dict[str, Any] = {
                 "id": fc.get("id", f"call_{tc_index}"),
                 "type": "function",
                 "function": {
                     "name": fc.get("name", ""),
-                    "arguments": json.dumps(fc.get("args", {})),
+                    "arguments": arguments,
                 },
             }
             # Preserve thoughtSignature for roundtrip (API requires it back)
@@ -307,7 +471,7 @@ def _google_to_openai_message(response: Dict[str, Any]) -> Dict[str, Any]:
         msg["tool_calls"] = tool_calls
 
     # Debug: log when we got parts but no usable content
-    if not text_parts and not tool_calls and parts:
+    if not text_parts and not tool_calls and parts and log.isEnabledFor(logging.WARNING):
         log.warning("Antigravity: response had %d parts but no text/tool_calls. Part keys: %s",
                      len(parts), [list(p.keys()) for p in parts[:3]])
 
@@ -330,6 +494,204 @@ def _extract_usage(response: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+# ---------------------------------------------------------------------------
+# Request building & response handling (shared by chat / achat)
+# ---------------------------------------------------------------------------
+
+# api_model → "claude" | "high" | "low" | "" — the set of models is tiny and
+# fixed, so classify each one once instead of substring-scanning per request.
+_THINKING_FAMILY: Dict[str, str] = {}
+
+# Shared (never mutated) thinkingConfig per family from _thinking_family()
+_THINKING_CONFIGS: Dict[str, Dict[str, Any]] = {
+    # Claude thinking models
+    "claude": {"include_thoughts": True, "thinking_budget": 32768},
+    # Gemini 3 Pro/Flash: use thinkingLevel
+    "high": {"thinkingLevel": "high"},
+    "low": {"thinkingLevel": "low"},
+}
+
+# Envelope fields identical on every request
+_STATIC_BODY: Dict[str, str] = {"requestType": "agent", "userAgent": "antigravity"}
+
+
+def _thinking_family(api_model: str) -> str:
+    """Thinking config family for an API model name ("" = no thinkingConfig)."""
+    family = _THINKING_FAMILY.get(api_model)
+    if family is None:
+        if "thinking" in api_model:
+            family = "claude"
+        elif "gemini-3" in api_model:
+            # Pro needs "high"; Flash accepts any
+            family = "high" if "pro" in api_model else "low"
+        else:
+            # gemini-2.5-* and gemini-2.0-*: NO thinkingConfig (causes 400)
+            family = ""
+        _THINKING_FAMILY[api_model] = family
+    return family
+
+
+def _build_request(
+    messages: List[Dict[str, Any]],
+    model: str,
+    tools: Optional[List[Dict[str, Any]]],
+    max_tokens: int,
+    project_id: str,
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the Antigravity request body. Returns (api_model, body)."""
+    api_model = _resolve_model(model)
+
+    # NOTE: do NOT set x-goog-user-project header — causes 403 on managed projects.
+    # Project ID goes in the body instead.
+
+    inner_body = _openai_to_google(messages, tools)
+
+    # Generation config + thinking config per model family (verified via scan)
+    family = _thinking_family(api_model)
+    gen_config: Dict[str, Any] = {"maxOutputTokens": max_tokens, "temperature": 1.0}
+    if family:
+        gen_config["thinkingConfig"] = _THINKING_CONFIGS[family]
+        if family == "claude":
+            gen_config["maxOutputTokens"] = max(max_tokens, 65536)
+    inner_body["generationConfig"] = gen_config
+
+    # Antigravity wraps the request: {project, model, request, requestType, ...}
+    body = {
+        **_STATIC_BODY,
+        "project": project_id or "",
+        "model": api_model,
+        "request": {
+            "model": api_model,
+            **inner_body,
+        },
+        "requestId": "agent-" + secrets.token_hex(16),
+    }
+    return api_model, body
+
+
+def _endpoint_error(
+    resp: Any, endpoint: str, api_model: str, body: Dict[str, Any],
+) -> Optional[str]:
+    """Classify a requests/httpx response. Returns an error string if the next endpoint should be tried.
+
+    The body is decoded to text only for error statuses; successes are parsed
+    from the raw bytes.
+    """
+    status = resp.status_code
+    if status < 400:
+        return None
+
+    if status == 429:
+        log.warning("Rate limited on %s, trying next endpoint", endpoint)
+        return f"429 from {endpoint}"
+
+    text = resp.text
+
+    if status == 403:
+        log.warning("Permission denied on %s: %s", endpoint, text[:200])
+        return f"403 from {endpoint}: {text[:200]}"
+
+    if status in (400, 404):
+        _log_request_diag(status, text, endpoint, api_model, body)
+        return f"{status} from {endpoint}: {text[:200]}"
+
+    if status >= 500:
+        log.warning("Server error %d on %s, trying next endpoint", status, endpoint)
+        return f"{status} from {endpoint}: {text[:200]}"
+
+    return None
+
+
+# Diagnostics scan only the most recent contents (where a bad FC/FR pairing
+# usually is) and are written to Drive off the request thread.
+_DIAG_MAX_CONTENTS = 32
+_DIAG_MAX_ENTRIES = 32
+_DIAG_WRITER: Optional[ThreadPoolExecutor] = None
+
+
+def _emit_diag_event(event: Dict[str, Any]) -> None:
+    """Append a diag event to events.jsonl on a background thread (Drive I/O is slow)."""
+    global _DIAG_WRITER
+    if _DIAG_WRITER is None:
+        _DIAG_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="antigravity-diag")
+    drive_logs = pathlib.Path(os.environ.get("OUROBOROS_DRIVE_LOGS", "/content/drive/MyDrive/Ouroboros/logs"))
+    try:
+        _DIAG_WRITER.submit(append_jsonl, drive_logs / "events.jsonl", event)
+    except RuntimeError:
+        log.debug("Diag writer unavailable (interpreter shutting down)", exc_info=True)
+
+
+def _log_request_diag(
+    status: int, text: str, endpoint: str, api_model: str, body: Dict[str, Any],
+) -> None:
+    """Log request details for debugging a 400/404."""
+    request = body.get("request", {})
+    n_tools = len(request.get("tools", [{}])[0].get("functionDeclarations", [])) if request.get("tools") else 0
+    contents = request.get("contents", [])
+    n_contents = len(contents)
+    # Dump which contents have functionCall/Response parts for debugging
+    fc_diag: List[str] = []
+    first = max(0, n_contents - _DIAG_MAX_CONTENTS)
+    for ci in range(first, n_contents):
+        for pi, p in enumerate(contents[ci].get("parts", [])):
+            if "functionCall" in p:
+                has_ts = "thoughtSignature" in p
+                fc_name = p["functionCall"].get("name", "?")
+                fc_keys = sorted(p["functionCall"].keys())
+                fc_diag.append(f"C{ci}P{pi}:FC({fc_name},ts={has_ts},keys={fc_keys})")
+            elif "functionResponse" in p:
+                fr_keys = sorted(p["functionResponse"].keys())
+                fc_diag.append(f"C{ci}P{pi}:FR({p['functionResponse'].get('name','?')},keys={fr_keys})")
+        if len(fc_diag) >= _DIAG_MAX_ENTRIES:
+            break
+    if log.isEnabledFor(logging.WARNING):
+        log.warning(
+            "%d on %s: model=%s, tools=%d, contents=%d, FC/FR: [%s], resp=%s",
+            status, endpoint, api_model, n_tools, n_contents,
+            ", ".join(fc_diag) if fc_diag else "none",
+            text[:300],
+        )
+    # Also emit to events.jsonl so user can see it
+    _emit_diag_event({
+        "ts": utc_now_iso(), "type": "antigravity_api_diag",
+        "status": status,
+        "model": api_model,
+        "model_sent": body.get("model", "?"),
+        "n_contents": n_contents,
+        "n_tools": n_tools,
+        "fc_fr_diag": fc_diag,
+        "resp_text": text[:500],
+    })
+
+
+def _parse_response(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Unwrap the Antigravity envelope. Returns (message_dict, usage_dict)."""
+    # Antigravity wraps response: {response: {candidates, ...}, traceId, metadata}
+    if "response" in data and "candidates" in data["response"]:
+        data = data["response"]
+    return _google_to_openai_message(data), _extract_usage(data)
+
+
+# Async transport: one httpx.AsyncClient + concurrency semaphore per event loop
+# (both are bound to the loop they were first used on).
+_ASYNC_CONCURRENCY = int(os.environ.get("OUROBOROS_ANTIGRAVITY_CONCURRENCY", "16"))
+_ASYNC_STATE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[Any, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def _async_state() -> Tuple[Any, asyncio.Semaphore]:
+    loop = asyncio.get_running_loop()
+    state = _ASYNC_STATE.get(loop)
+    if state is None:
+        import httpx
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=10),
+            timeout=httpx.Timeout(120.0),
+        )
+        state = (client, asyncio.Semaphore(_ASYNC_CONCURRENCY))
+        _ASYNC_STATE[loop] = state
+    return state
+
+
 # ---------------------------------------------------------------------------
 # Main client
 # ---------------------------------------------------------------------------
@@ -346,143 +708,40 @@ class AntigravityClient:
         **kwargs,
     ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         """Call the Antigravity API. Returns (message_dict, usage_dict)."""
-        import requests
-
-        api_model = _resolve_model(model)
-        access_token = get_access_token()
-        project_id = get_project_id()
-        headers = _get_headers(access_token)
-
-        # NOTE: do NOT set x-goog-user-project header — causes 403 on managed projects.
-        # Project ID goes in the body instead.
-
-        inner_body = _openai_to_google(messages, tools)
-
-        # Generation config
-        inner_body["generationConfig"] = {
-            "maxOutputTokens": max_tokens,
-            "temperature": 1.0,
-        }
-
-        # Add thinking config per model family (verified via scan)
-        if "thinking" in api_model:
-            # Claude thinking models
-            inner_body["generationConfig"]["thinkingConfig"] = {
-                "include_thoughts": True,
-                "thinking_budget": 32768,
-            }
-            inner_body["generationConfig"]["maxOutputTokens"] = max(max_tokens, 65536)
-        elif "gemini-3" in api_model:
-            # Gemini 3 Pro/Flash: use thinkingLevel
-            # Pro needs "high"; Flash accepts any
-            level = "high" if "pro" in api_model else "low"
-            inner_body["generationConfig"]["thinkingConfig"] = {
-                "thinkingLevel": level,
-            }
-        # gemini-2.5-* and gemini-2.0-*: NO thinkingConfig (causes 400)
+        api_model, body = _build_request(messages, model, tools, max_tokens, get_project_id())
+        token = get_access_token()
+        headers = _get_headers(token)
 
-        # Antigravity wraps the request: {project, model, request, requestType, ...}
-        import uuid
-        body = {
-            "project": project_id or "",
-            "model": api_model,
-            "request": {
-                "model": api_model,
-                **inner_body,
-            },
-            "requestType": "agent",
-            "userAgent": "antigravity",
-            "requestId": f"agent-{uuid.uuid4()}",
-        }
+        # Serialize once: the same bytes are re-sent on every fallback/retry
+        data = _json_bytes(body)
 
         # Try endpoints with fallback
+        session = _session()
         last_error = None
-        for endpoint in ENDPOINTS:
+        endpoints = _endpoint_order()
+        for attempt, endpoint in enumerate(endpoints):
             # URL has NO /models/{model} — model is in the body
             url = f"{endpoint}/v1internal:generateContent"
             try:
-                resp = requests.post(
-                    url,
-                    headers=headers,
-                    json=body,
-                    timeout=120,
-                )
+                resp = session.post(url, headers=headers, data=data, timeout=120)
 
                 if resp.status_code == 401:
-                    # Token expired — refresh and retry once
-                    access_token = get_access_token()
-                    headers = _get_headers(access_token)
-                    resp = requests.post(url, headers=headers, json=body, timeout=120)
-
-                if resp.status_code == 429:
-                    log.warning("Rate limited on %s, trying next endpoint", endpoint)
-                    last_error = f"429 from {endpoint}"
-                    continue
-
-                if resp.status_code == 403:
-                    log.warning("Permission denied on %s: %s", endpoint, resp.text[:200])
-                    last_error = f"403 from {endpoint}: {resp.text[:200]}"
-                    continue
-
-                if resp.status_code in (400, 404):
-                    # Log request details for debugging
-                    n_tools = len(body.get("request", {}).get("tools", [{}])[0].get("functionDeclarations", [])) if body.get("request", {}).get("tools") else 0
-                    n_contents = len(body.get("request", {}).get("contents", []))
-                    has_fn_call = any(
-                        any("functionCall" in p for p in c.get("parts", []))
-                        for c in body.get("request", {}).get("contents", [])
-                    )
-                    has_fn_response = any(
-                        any("functionResponse" in p for p in c.get("parts", []))
-                        for c in body.get("request", {}).get("contents", [])
-                    )
-                    # Dump which contents have functionCall/Response parts for debugging
-                    fc_diag = []
-                    for ci, c in enumerate(body.get("request", {}).get("contents", [])):
-                        for pi, p in enumerate(c.get("parts", [])):
-                            if "functionCall" in p:
-                                has_ts = "thoughtSignature" in p
-                                fc_name = p["functionCall"].get("name", "?")
-                                fc_keys = sorted(p["functionCall"].keys())
-                                fc_diag.append(f"C{ci}P{pi}:FC({fc_name},ts={has_ts},keys={fc_keys})")
-                            elif "functionResponse" in p:
-                                fr_keys = sorted(p["functionResponse"].keys())
-                                fc_diag.append(f"C{ci}P{pi}:FR({p['functionResponse'].get('name','?')},keys={fr_keys})")
-                    log.warning(
-                        "%d on %s: model=%s, tools=%d, contents=%d, FC/FR: [%s], resp=%s",
-                        resp.status_code, endpoint, api_model, n_tools, n_contents,
-                        ", ".join(fc_diag) if fc_diag else "none",
-                        resp.text[:300],
-                    )
-                    # Also emit to events.jsonl so user can see it
-                    try:
-                        import pathlib as _pl
-                        _drive_logs = _pl.Path(os.environ.get("OUROBOROS_DRIVE_LOGS", "/content/drive/MyDrive/Ouroboros/logs"))
-                        append_jsonl(_drive_logs / "events.jsonl", {
-                            "ts": utc_now_iso(), "type": "antigravity_api_diag",
-                            "status": resp.status_code,
-                            "model": api_model,
-                            "model_sent": body.get("model", "?"),
-                            "n_contents": n_contents,
-                            "n_tools": n_tools,
-                            "fc_fr_diag": fc_diag,
-                            "resp_text": resp.text[:500],
-                        })
-                    except Exception:
-                        pass
-                    last_error = f"{resp.status_code} from {endpoint}: {resp.text[:200]}"
+                    # Token rejected — the cached one can't be reused, force a refresh
+                    token = refresh_rejected_token(token)
+                    headers = _get_headers(token)
+                    resp = session.post(url, headers=headers, data=data, timeout=120)
+
+                error = _endpoint_error(resp, endpoint, api_model, body)
+                if error:
+                    last_error = error
+                    if _should_back_off(resp.status_code) and attempt + 1 < len(endpoints):
+                        time.sleep(_backoff_delay(attempt))
                     continue
 
                 resp.raise_for_status()
-                data = resp.json()
-
-                # Antigravity wraps response: {response: {candidates, ...}, traceId, metadata}
-                if "response" in data and "candidates" in data["response"]:
-                    data = data["response"]
-
-                msg = _google_to_openai_message(data)
-                usage = _extract_usage(data)
-                return msg, usage
+                result = _parse_response(_json_loads(resp.content))
+                _mark_endpoint_good(endpoint)
+                return result
 
             except requests.exceptions.Timeout:
                 last_error = f"Timeout on {endpoint}"
@@ -492,5 +751,113 @@ class AntigravityClient:
                 last_error = f"Error on {endpoint}: {e}"
                 log.warning("Request to %s failed: %s", endpoint, e)
                 continue
+            except json.JSONDecodeError as e:
+                last_error = f"Malformed JSON from {endpoint}: {e}"
+                log.warning("Malformed JSON from %s: %s", endpoint, e)
+                continue
 
         raise RuntimeError(f"All Antigravity endpoints failed. Last error: {last_error}")
+
+    async def achat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        max_tokens: int = 16384,
+        **kwargs,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Async chat() over a shared httpx.AsyncClient. Returns (message_dict, usage_dict).
+
+        At most OUROBOROS_ANTIGRAVITY_CONCURRENCY calls per event loop are in flight.
+        """
+        import httpx
+
+        client, semaphore = _async_state()
+        # Both lookups are in-memory on the hot path (project id costs one
+        # stat); only a token that needs loading/refreshing goes to a thread.
+        project_id = get_project_id()
+        api_model, body = _build_request(messages, model, tools, max_tokens, project_id)
+        token = cached_access_token() or await asyncio.to_thread(get_access_token)
+        headers = _get_headers(token)
+        data = _json_bytes(body)
+
+        last_error = None
+        async with semaphore:
+            endpoints = _endpoint_order()
+            for attempt, endpoint in enumerate(endpoints):
+                url = f"{endpoint}/v1internal:generateContent"
+                try:
+                    resp = await client.post(url, headers=headers, content=data)
+
+                    if resp.status_code == 401:
+                        token = await asyncio.to_thread(refresh_rejected_token, token)
+                        headers = _get_headers(token)
+                        resp = await client.post(url, headers=headers, content=data)
+
+                    error = _endpoint_error(resp, endpoint, api_model, body)
+                    if error:
+                        last_error = error
+                        if _should_back_off(resp.status_code) and attempt + 1 < len(endpoints):
+                            await asyncio.sleep(_backoff_delay(attempt))
+                        continue
+
+                    resp.raise_for_status()
+                    result = _parse_response(_json_loads(resp.content))
+                    _mark_endpoint_good(endpoint)
+                    return result
+
+                except httpx.TimeoutException:
+                    last_error = f"Timeout on {endpoint}"
+                    log.warning("Timeout on %s", endpoint)
+                    continue
+                except (httpx.HTTPError, requests.exceptions.RequestException) as e:
+                    # requests errors come from the token refresh on a 401
+                    last_error = f"Error on {endpoint}: {e}"
+                    log.warning("Request to %s failed: %s", endpoint, e)
+                    continue
+                except json.JSONDecodeError as e:
+                    last_error = f"Malformed JSON from {endpoint}: {e}"
+                    log.warning("Malformed JSON from %s: %s", endpoint, e)
+                    continue
+
+        raise RuntimeError(f"All Antigravity endpoints failed. Last error: {last_error}")
+
+    async def achat_many(
+        self, calls: List[Dict[str, Any]], concurrency: int = 16,
+    ) -> List[Any]:
+        """Run many independent achat() calls concurrently.
+
+        Each item of ``calls`` holds achat() keyword arguments. Results come
+        back in order; a failed call yields its exception instead of aborting
+        the batch.
+        """
+        # Warm the shared token/project once so the batch doesn't stampede a refresh.
+        # Best effort: on failure each achat() retries and reports its own error.
+        try:
+            await asyncio.to_thread(get_access_token)
+            await asyncio.to_thread(get_project_id)
+        except Exception:
+            log.debug("achat_many warm-up failed; calls will authenticate individually", exc_info=True)
+        gate = asyncio.Semaphore(max(1, concurrency))
+
+        async def one(call: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            async with gate:
+                return await self.achat(**call)
+
+        return await asyncio.gather(*(one(c) for c in calls), return_exceptions=True)
+
+    def chat_many(self, calls: List[Dict[str, Any]], concurrency: int = 16) -> List[Any]:
+        """Blocking achat_many() for synchronous callers (must not run inside an event loop)."""
+        async def run() -> List[Any]:
+            try:
+                return await self.achat_many(calls, concurrency)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(run())
+
+    async def aclose(self) -> None:
+        """Close the running loop's shared AsyncClient (call before a private loop ends)."""
+        state = _ASYNC_STATE.pop(asyncio.get_running_loop(), None)
+        if state is not None:
+            await state[0].aclose()
@@ -13,7 +13,7 @@ import pathlib
 import queue
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import CancelledError, ThreadPoolExecutor, as_completed
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import logging
@@ -75,8 +75,7 @@ def _get_pricing() -> Dict[str, Tuple[float, float, float]]:
             if _live and len(_live) > 5:
                 _cached_pricing.update(_live)
         except Exception as e:
-            import logging as _log
-            _log.getLogger(__name__).warning("Failed to sync pricing from OpenRouter: %s", e)
+            log.warning("Failed to sync pricing from OpenRouter: %s", e)
             # Reset flag so we retry next time
             _pricing_fetched = False
 
@@ -219,11 +218,26 @@ class _StatefulToolExecutor:
             self._executor.shutdown(wait=False, cancel_futures=True)
             self._executor = None
 
-    def shutdown(self, wait=True, cancel_futures=False):
-        """Final cleanup."""
-        if self._executor is not None:
-            self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
-            self._executor = None
+
+# Process-wide: the Playwright driver (bound to this thread) outlives single
+# tasks instead of being reset every time a new task starts a new thread.
+_STATEFUL_EXECUTOR = _StatefulToolExecutor()
+
+
+def _reset_after_fork() -> None:
+    """The executor's thread does not survive fork; the child starts its own."""
+    _STATEFUL_EXECUTOR._executor = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def run_on_stateful_thread(fn, *args, timeout: Optional[float] = None):
+    """Run fn on the browser tools' sticky thread; inline if no browser tool ever ran."""
+    if _STATEFUL_EXECUTOR._executor is None:
+        return fn(*args)
+    return _STATEFUL_EXECUTOR.submit(fn, *args).result(timeout=timeout)
 
 
 def _make_timeout_result(
@@ -310,6 +324,11 @@ def _execute_with_timeout(
                 fn_name, tool_call_id, is_code_tool, tc, drive_logs,
                 timeout_sec, task_id, reset_msg
             )
+        except CancelledError:
+            # Shared across tasks: another task's timeout reset it before this call ran
+            return {"tool_call_id": tool_call_id, "fn_name": fn_name, "is_error": True,
+                    "result": f"⚠️ TOOL_ERROR ({fn_name}): cancelled by a browser reset in another task. Retry.",
+                    "args_for_log": {}, "is_code_tool": is_code_tool}
     else:
         # Regular executor: explicit lifecycle to avoid shutdown(wait=True) deadlock
         executor = ThreadPoolExecutor(max_workers=1)
@@ -633,7 +652,7 @@ def run_llm_loop(
     tools._ctx.event_queue = event_queue
     tools._ctx.task_id = task_id
     # Thread-sticky executor for browser tools (Playwright sync requires greenlet thread-affinity)
-    stateful_executor = _StatefulToolExecutor()
+    stateful_executor = _STATEFUL_EXECUTOR
     # Dedup set for per-task owner messages from Drive mailbox
     _owner_msg_seen: set = set()
     try:
@@ -771,12 +790,7 @@ def run_llm_loop(
                 return budget_result
 
     finally:
-        # Cleanup thread-sticky executor for stateful tools
-        if stateful_executor:
-            try:
-                stateful_executor.shutdown(wait=False, cancel_futures=True)
-            except Exception:
-                log.warning("Failed to shutdown stateful executor", exc_info=True)
+        # Sticky executor is process-wide; agent closes the task's browser on it
         # Cleanup per-task mailbox
         if drive_root is not None and task_id:
             try:
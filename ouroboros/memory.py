@@ -10,7 +10,7 @@ from __future__ import annotations
 import json
 import logging
 import pathlib
-from collections import Counter
+from collections import Counter, deque
 from typing import Any, Dict, List, Optional
 
 from ouroboros.utils import utc_now_iso, read_text, write_text, append_jsonl, short
@@ -18,6 +18,38 @@ from ouroboros.utils import utc_now_iso, read_text, write_text, append_jsonl, sh
 log = logging.getLogger(__name__)
 
 
+_TAIL_BLOCK = 64 * 1024
+
+_ERROR_EVENT_TYPES = frozenset({"tool_error", "telegram_api_error", "task_error", "tool_rounds_exceeded"})
+
+
+def _read_tail_text(path: pathlib.Path, n_lines: int) -> str:
+    """Decode only the last n_lines lines of a file, reading backwards from EOF.
+
+    Logs grow without bound; context building only needs their tail.
+    """
+    chunks: List[bytes] = []  # newest first
+    newlines = 0
+    trailing = -1  # newlines in the file's trailing whitespace, once known
+    with path.open("rb") as f:
+        pos = f.seek(0, 2)
+        while pos > 0 and (trailing < 0 or newlines - trailing < n_lines):
+            step = min(_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            chunks.append(chunk)
+            newlines += chunk.count(b"\n")
+            if trailing < 0 and chunk.strip():
+                joined = b"".join(reversed(chunks))
+                trailing = joined.count(b"\n", len(joined.rstrip()))
+    buf = b"".join(reversed(chunks))
+    if pos > 0:
+        # Drop the partial first line (it may also start mid-character)
+        buf = buf[buf.index(b"\n") + 1:]
+    return buf.decode("utf-8")
+
+
 class Memory:
     """Ouroboros memory management: scratchpad, identity, chat history, logs."""
 
@@ -129,7 +161,11 @@ class Memory:
         if not path.exists():
             return []
         try:
-            lines = path.read_text(encoding="utf-8").strip().split("\n")
+            if max_entries > 0:
+                text = _read_tail_text(path, max_entries)
+            else:
+                text = path.read_text(encoding="utf-8")
+            lines = text.strip().split("\n")
             tail = lines[-max_entries:] if max_entries < len(lines) else lines
             entries = []
             for line in tail:
@@ -200,18 +236,21 @@ class Memory:
     def summarize_events(self, entries: List[Dict[str, Any]]) -> str:
         if not entries:
             return ""
+        # One pass: type counts plus the last 10 errors
         type_counts: Counter = Counter()
+        errors: deque = deque(maxlen=10)
         for e in entries:
-            type_counts[e.get("type", "unknown")] += 1
+            evt_type = e.get("type", "unknown")
+            type_counts[evt_type] += 1
+            if evt_type in _ERROR_EVENT_TYPES:
+                errors.append(e)
         top_types = type_counts.most_common(10)
         lines = ["Event counts:"]
         for evt_type, count in top_types:
             lines.append(f"  {evt_type}: {count}")
-        error_types = {"tool_error", "telegram_api_error", "task_error", "tool_rounds_exceeded"}
-        errors = [e for e in entries if e.get("type") in error_types]
         if errors:
             lines.append("\nRecent errors:")
-            for e in errors[-10:]:
+            for e in errors:
                 lines.append(f"  {e.get('type', '?')}: {short(str(e.get('error', '')), 120)}")
         return "\n".join(lines)
 
@@ -7,9 +7,11 @@ Review tasks go through the standard agent tool loop (LLM-first).
 
 from __future__ import annotations
 
+import hashlib
 import os
 import pathlib
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from ouroboros.utils import clip_text, estimate_tokens
 
@@ -20,12 +22,64 @@ _SKIP_EXT = {
     ".avi", ".wav", ".ogg", ".opus", ".woff", ".woff2", ".ttf", ".otf",
     ".class", ".so", ".dylib", ".bin",
 }
+_SKIP_EXT_SUFFIXES = tuple(sorted(_SKIP_EXT))
+
+_DEF_PREFIXES = ("def ", "async def ")
 
 
 # ---------------------------------------------------------------------------
 # Complexity metrics
 # ---------------------------------------------------------------------------
 
+# (is_py, blake2b(content)) → (line_count, [(def_line, length), ...]). Review
+# context and codebase_health re-scan a mostly unchanged tree, so repeat
+# calls only hash the content. A 128-bit digest, not hash(): a collision
+# would silently return another file's metrics.
+_STRUCTURE_CACHE: Dict[Tuple[bool, bytes], Tuple[int, List[Tuple[int, int]]]] = {}
+_STRUCTURE_CACHE_MAX = 4096
+
+
+def _file_structure(content: str, is_py: bool) -> Tuple[int, List[Tuple[int, int]]]:
+    """Line count and (start_line, length) of every def (Python files only)."""
+    key = (is_py, hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+    hit = _STRUCTURE_CACHE.get(key)
+    if hit is not None:
+        return hit
+
+    lines = content.splitlines()
+    spans: List[Tuple[int, int]] = []
+    if is_py:
+        # One pass: def starts plus the indent of every code line (-1 for
+        # blank/comment lines, which never end a function body).
+        func_starts: List[int] = []
+        indents: List[int] = []
+        for i, line in enumerate(lines):
+            stripped = line.lstrip()
+            if not stripped or stripped[0] == "#":
+                indents.append(-1)
+                continue
+            indents.append(len(line) - len(stripped))
+            if stripped.startswith(_DEF_PREFIXES):
+                func_starts.append(i)
+
+        for j, start in enumerate(func_starts):
+            def_indent = indents[start]
+            # End: first code line with indent <= def_indent, capped at the
+            # next function start (so each line is scanned at most once).
+            end = func_starts[j + 1] if j + 1 < len(func_starts) else len(lines)
+            for k in range(start + 1, end):
+                if 0 <= indents[k] <= def_indent:
+                    end = k
+                    break
+            spans.append((start, end - start))
+
+    if len(_STRUCTURE_CACHE) >= _STRUCTURE_CACHE_MAX:
+        _STRUCTURE_CACHE.clear()
+    result = (len(lines), spans)
+    _STRUCTURE_CACHE[key] = result
+    return result
+
+
 def compute_complexity_metrics(sections: List[Tuple[str, str]]) -> Dict[str, Any]:
     """Compute codebase complexity metrics from collected sections."""
     total_lines = 0
@@ -36,47 +90,16 @@ def compute_complexity_metrics(sections: List[Tuple[str, str]]) -> Dict[str, Any
     py_files = 0
 
     for path, content in sections:
-        lines = content.splitlines()
-        line_count = len(lines)
+        is_py = path.endswith(".py")
+        line_count, spans = _file_structure(content, is_py)
         total_lines += line_count
         file_sizes.append((path, line_count))
 
-        if not path.endswith(".py"):
+        if not is_py:
             continue
         py_files += 1
-
-        func_starts: List[int] = []
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            if stripped.startswith("def ") or stripped.startswith("async def "):
-                func_starts.append(i)
-                total_functions += 1
-
-        for j, start in enumerate(func_starts):
-            # Get indentation of the def line
-            def_line = lines[start]
-            def_indent = len(def_line) - len(def_line.lstrip())
-
-            # Find end: first non-blank, non-comment line with indent <= def_indent
-            end = len(lines)
-            for k in range(start + 1, len(lines)):
-                line = lines[k]
-                stripped = line.strip()
-                # Skip blank lines and comments
-                if not stripped or stripped.startswith("#"):
-                    continue
-                # Check indentation
-                line_indent = len(line) - len(line.lstrip())
-                if line_indent <= def_indent:
-                    end = k
-                    break
-
-            # Cap at next function start if it comes first
-            if j + 1 < len(func_starts):
-                end = min(end, func_starts[j + 1])
-
-            length = end - start
-            function_lengths.append((path, start, length))
+        total_functions += len(spans)
+        function_lengths.extend((path, start, length) for start, length in spans)
 
     # Compute aggregates
     func_lens = [length for _, _, length in function_lengths]
@@ -119,6 +142,54 @@ def format_metrics(metrics: Dict[str, Any]) -> str:
 # File collection
 # ---------------------------------------------------------------------------
 
+_READ_WORKERS = 8
+_READ_BATCH = 32
+
+
+def _iter_files(dirpath: str, skip_dirs: set) -> Iterator["os.DirEntry[str]"]:
+    """Yield regular files depth-first in os.walk order (files, then sorted subdirs)."""
+    try:
+        with os.scandir(dirpath) as it:
+            entries = sorted(it, key=lambda e: e.name)
+    except OSError:
+        return
+    subdirs = []
+    for entry in entries:
+        try:
+            if entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in skip_dirs:
+                    subdirs.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+        except OSError:
+            continue
+    for sub in subdirs:
+        yield from _iter_files(sub, skip_dirs)
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        return pathlib.Path(path).read_text(encoding="utf-8", errors="replace")
+    except Exception:
+        return None
+
+
+def _has_text(path: str) -> bool:
+    """Same test as content.strip(), reading only up to the first non-blank chunk."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            while True:
+                chunk = f.read(8192)
+                if not chunk:
+                    return False
+                if not chunk.isspace():
+                    return True
+    except OSError:
+        return False
+
+
 def collect_sections(
     repo_dir: pathlib.Path,
     drive_root: pathlib.Path,
@@ -126,50 +197,52 @@ def collect_sections(
     max_total_chars: int = 4_000_000,
 ) -> Tuple[List[Tuple[str, str]], Dict[str, Any]]:
     """Walk repo and drive, collect text files as (path, content) pairs."""
+    candidates: List[Tuple[str, "os.DirEntry[str]"]] = []
+    for root, prefix, skip_dirs in (
+        (repo_dir, "repo", {"__pycache__", ".git", ".pytest_cache", ".mypy_cache", "node_modules", ".venv"}),
+        (drive_root, "drive", {"archive", "locks", "downloads", "screenshots"}),
+    ):
+        try:
+            root_resolved = root.resolve()
+            if not root_resolved.exists():
+                continue
+        except Exception:
+            continue
+        root_str = str(root_resolved)
+        for entry in _iter_files(root_str, skip_dirs):
+            if entry.name.lower().endswith(_SKIP_EXT_SUFFIXES):
+                continue
+            rel = os.path.relpath(entry.path, root_str).replace(os.sep, "/")
+            candidates.append((f"{prefix}/{rel}", entry))
+
     sections: List[Tuple[str, str]] = []
     total_chars = 0
     truncated = 0
     dropped = 0
 
-    def _walk(root: pathlib.Path, prefix: str, skip_dirs: set) -> None:
-        nonlocal total_chars, truncated, dropped
-        try:
-            root_resolved = root.resolve()
-            if not root_resolved.exists():
-                return
-        except Exception:
-            return
-
-        for dirpath, dirnames, filenames in os.walk(str(root_resolved)):
-            dirnames[:] = [d for d in sorted(dirnames) if d not in skip_dirs]
-            for fn in sorted(filenames):
-                try:
-                    p = pathlib.Path(dirpath) / fn
-                    if not p.is_file() or p.is_symlink():
-                        continue
-                    if p.suffix.lower() in _SKIP_EXT:
-                        continue
-                    content = p.read_text(encoding="utf-8", errors="replace")
-                    if not content.strip():
-                        continue
-                    rel = p.relative_to(root_resolved).as_posix()
-                    if len(content) > max_file_chars:
-                        content = clip_text(content, max_file_chars)
-                        truncated += 1
-                    if total_chars >= max_total_chars:
-                        dropped += 1
-                        continue
-                    if (total_chars + len(content)) > max_total_chars:
-                        content = clip_text(content, max(2000, max_total_chars - total_chars))
-                        truncated += 1
-                    sections.append((f"{prefix}/{rel}", content))
-                    total_chars += len(content)
-                except Exception:
+    # Reads overlap on a small pool; budget/truncation stays serial and in
+    # walk order. Batches bound how far reads run ahead of the budget.
+    with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+        for i in range(0, len(candidates), _READ_BATCH):
+            batch = candidates[i:i + _READ_BATCH]
+            if total_chars >= max_total_chars:
+                # Budget exhausted: count the non-blank rest without reading them in full
+                dropped += sum(pool.map(_has_text, [e.path for _, e in batch]))
+                continue
+            for (name, _entry), content in zip(batch, pool.map(_read_text, [e.path for _, e in batch])):
+                if content is None or not content.strip():
                     continue
-
-    _walk(repo_dir, "repo",
-          {"__pycache__", ".git", ".pytest_cache", ".mypy_cache", "node_modules", ".venv"})
-    _walk(drive_root, "drive", {"archive", "locks", "downloads", "screenshots"})
+                if total_chars >= max_total_chars:
+                    dropped += 1
+                    continue
+                if len(content) > max_file_chars:
+                    content = clip_text(content, max_file_chars)
+                    truncated += 1
+                if (total_chars + len(content)) > max_total_chars:
+                    content = clip_text(content, max(2000, max_total_chars - total_chars))
+                    truncated += 1
+                sections.append((name, content))
+                total_chars += len(content)
 
     stats = {"files": len(sections), "chars": total_chars,
              "truncated": truncated, "dropped": dropped}
@@ -10,13 +10,19 @@ not module-level globals — safe across threads.
 
 from __future__ import annotations
 
-import base64
 import logging
+import os
+import pathlib
 import subprocess
 import sys
 import threading
 from typing import Any, Dict, List
 
+try:
+    import pybase64 as _b64  # optional: SIMD base64 for screenshots
+except ImportError:
+    import base64 as _b64
+
 try:
     from playwright_stealth import Stealth
     _HAS_STEALTH = True
@@ -32,6 +38,48 @@ _playwright_ready = False
 # Persists across ToolContext recreations but can be reset on error
 _pw_instance = None
 _pw_thread_id = None  # Track which thread owns the Playwright instance
+# Chromium is launched once and shared; each task gets its own BrowserContext
+# (fresh cookies/storage), which is far cheaper than a cold browser start.
+_browser = None
+
+
+def _reset_after_fork() -> None:
+    """Forget the parent's Playwright driver and browser in a forked child.
+
+    Their pipes and greenlet belong to the parent's sticky thread, which does
+    not exist here; the child starts its own on first use. No pkill: the
+    Chromium processes still serve the parent.
+    """
+    global _pw_instance, _pw_thread_id, _browser
+    _pw_instance = None
+    _pw_thread_id = None
+    _browser = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+# Dropped while loading pages for text/markdown/html output. Stylesheets are
+# kept: innerText depends on computed styles (display:none etc.).
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+
+def _chromium_installed() -> bool:
+    """Check the browsers dir on disk instead of starting a Playwright driver.
+
+    Playwright writes INSTALLATION_COMPLETE into each browser dir once the
+    download finishes (chromium-*, chromium_headless_shell-*).
+    """
+    browsers_path = os.environ.get("PLAYWRIGHT_BROWSERS_PATH", "")
+    if browsers_path == "0":
+        # Hermetic install: browsers live inside the package
+        import playwright
+        root = pathlib.Path(playwright.__file__).parent / "driver" / "package" / ".local-browsers"
+    elif browsers_path:
+        root = pathlib.Path(browsers_path)
+    else:
+        root = pathlib.Path.home() / ".cache" / "ms-playwright"
+    return any((d / "INSTALLATION_COMPLETE").exists() for d in root.glob("chromium*"))
 
 
 def _ensure_playwright_installed():
@@ -46,12 +94,9 @@ def _ensure_playwright_installed():
         log.info("Playwright not found, installing...")
         subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
 
-    try:
-        from playwright.sync_api import sync_playwright
-        with sync_playwright() as pw:
-            pw.chromium.executable_path
+    if _chromium_installed():
         log.info("Playwright chromium binary found")
-    except Exception:
+    else:
         log.info("Installing Playwright chromium binary...")
         subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
         subprocess.check_call([sys.executable, "-m", "playwright", "install-deps", "chromium"])
@@ -65,7 +110,7 @@ def _reset_playwright_greenlet():
     This is necessary because sync_playwright() uses greenlets internally,
     and once a greenlet dies, it cannot be reused across "threads".
     """
-    global _pw_instance, _pw_thread_id
+    global _pw_instance, _pw_thread_id, _browser
 
     log.info("Resetting Playwright greenlet state...")
 
@@ -90,16 +135,17 @@ def _reset_playwright_greenlet():
             log.debug(f"Failed to delete greenlet module {k} during reset", exc_info=True)
             pass
 
-    # Reset module-level instance and thread ID
+    # Reset module-level instances and thread ID
     _pw_instance = None
     _pw_thread_id = None
+    _browser = None
     log.info("Playwright greenlet state reset complete")
 
 
 def _ensure_browser(ctx: ToolContext):
-    """Create or reuse browser for this task. Browser state lives in ctx,
-    but Playwright instance is module-level to avoid greenlet issues."""
-    global _pw_instance, _pw_thread_id
+    """Create or reuse the page for this task. Page and context live in ctx;
+    the Playwright instance and Chromium are module-level and reused."""
+    global _pw_instance, _pw_thread_id, _browser
 
     # Check if we've switched threads - if so, reset everything
     current_thread_id = threading.get_ident()
@@ -142,37 +188,74 @@ def _ensure_browser(ctx: ToolContext):
     # Store reference in ctx for cleanup
     ctx.browser_state.pw_instance = _pw_instance
 
-    ctx.browser_state.browser = _pw_instance.chromium.launch(
-        headless=True,
-        args=[
-            "--no-sandbox",
-            "--disable-dev-shm-usage",
-            "--disable-blink-features=AutomationControlled",
-            "--disable-features=site-per-process",
-            "--window-size=1920,1080",
-        ],
-    )
-    ctx.browser_state.page = ctx.browser_state.browser.new_page(
+    try:
+        alive = _browser is not None and _browser.is_connected()
+    except Exception:
+        log.debug("Shared browser connection check failed", exc_info=True)
+        alive = False
+    if not alive:
+        _browser = _pw_instance.chromium.launch(
+            headless=True,
+            args=[
+                "--no-sandbox",
+                "--disable-dev-shm-usage",
+                "--disable-blink-features=AutomationControlled",
+                "--disable-features=site-per-process",
+                "--window-size=1920,1080",
+            ],
+        )
+        log.info("Launched shared Chromium")
+
+    ctx.browser_state.browser = _browser
+    ctx.browser_state.context = _browser.new_context(
         viewport={"width": 1920, "height": 1080},
         user_agent=(
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
             "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
         ),
     )
+    ctx.browser_state.page = ctx.browser_state.context.new_page()
 
     if _HAS_STEALTH:
         stealth = Stealth()
         stealth.apply_stealth_sync(ctx.browser_state.page)
 
+    # A fresh page has no request filter installed
+    ctx.browser_state.block_resources = False
+
     ctx.browser_state.page.set_default_timeout(30000)
     return ctx.browser_state.page
 
 
+def _abort_heavy_resources(route: Any) -> None:
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _set_resource_blocking(page: Any, ctx: ToolContext, block: bool) -> bool:
+    """Install or remove the image/font/media filter. Returns True if it changed.
+
+    The route is only present while blocking: request interception disables
+    the HTTP cache and costs a round trip per request, which full-page
+    (screenshot) loads should not pay.
+    """
+    if ctx.browser_state.block_resources == block:
+        return False
+    if block:
+        page.route("**/*", _abort_heavy_resources)
+    else:
+        page.unroute("**/*", _abort_heavy_resources)
+    ctx.browser_state.block_resources = block
+    return True
+
+
 def cleanup_browser(ctx: ToolContext) -> None:
-    """Close browser and playwright. Called by agent.py in finally block.
+    """Close this task's page and context. Called by agent.py in finally block.
 
-    Note: We DON'T stop the module-level _pw_instance here to allow reuse
-    across tasks. Only close the browser and page for this context.
+    Note: We DON'T stop the module-level _pw_instance or the shared Chromium
+    here, so the next task skips the cold start.
     """
     global _pw_instance
 
@@ -183,8 +266,8 @@ def cleanup_browser(ctx: ToolContext) -> None:
         log.debug("Failed to close browser page during cleanup", exc_info=True)
         pass
     try:
-        if ctx.browser_state.browser is not None:
-            ctx.browser_state.browser.close()
+        if ctx.browser_state.context is not None:
+            ctx.browser_state.context.close()
     except Exception as e:
         # If browser cleanup fails with thread error, reset everything
         if "cannot switch" in str(e) or "different thread" in str(e):
@@ -194,50 +277,64 @@ def cleanup_browser(ctx: ToolContext) -> None:
     # Clear ctx references but keep module-level _pw_instance alive for reuse
     ctx.browser_state.page = None
     ctx.browser_state.browser = None
+    ctx.browser_state.context = None
     ctx.browser_state.pw_instance = None
+    ctx.browser_state.block_resources = False
+
 
+_MARKDOWN_MAX_CHARS = 30000
 
-_MARKDOWN_JS = """() => {
+# Builds into one parts array and stops walking once `limit` chars are out:
+# on huge DOMs only the head of the text is returned over CDP, and the
+# Python side truncates to the same cap anyway.
+_MARKDOWN_JS = """(limit) => {
+    const parts = [];
+    let n = 0;
+    const emit = (s) => { parts.push(s); n += s.length; };
     const walk = (el) => {
-        let out = '';
         for (const child of el.childNodes) {
+            if (n > limit) return;
             if (child.nodeType === 3) {
                 const t = child.textContent.trim();
-                if (t) out += t + ' ';
+                if (t) emit(t + ' ');
             } else if (child.nodeType === 1) {
                 const tag = child.tagName;
                 if (['SCRIPT','STYLE','NOSCRIPT'].includes(tag)) continue;
                 if (['H1','H2','H3','H4','H5','H6'].includes(tag))
-                    out += '\\n' + '#'.repeat(parseInt(tag[1])) + ' ';
-                if (tag === 'P' || tag === 'DIV' || tag === 'BR') out += '\\n';
-                if (tag === 'LI') out += '\\n- ';
-                if (tag === 'A') out += '[';
-                out += walk(child);
-                if (tag === 'A') out += '](' + (child.href||'') + ')';
+                    emit('\\n' + '#'.repeat(parseInt(tag[1])) + ' ');
+                if (tag === 'P' || tag === 'DIV' || tag === 'BR') emit('\\n');
+                if (tag === 'LI') emit('\\n- ');
+                if (tag === 'A') emit('[');
+                walk(child);
+                if (tag === 'A') emit('](' + (child.href||'') + ')');
             }
         }
-        return out;
     };
-    return walk(document.body);
+    if (document.body) walk(document.body);
+    return parts.join('');
 }"""
 
 
+def _take_screenshot(page: Any, ctx: ToolContext) -> str:
+    data = page.screenshot(type="png", full_page=False)
+    b64 = _b64.b64encode(data).decode("ascii")
+    ctx.browser_state.last_screenshot_b64 = b64
+    return (
+        f"Screenshot captured ({len(b64)} bytes base64). "
+        f"Call send_photo(image_base64='__last_screenshot__') to deliver it to the owner."
+    )
+
+
 def _extract_page_output(page: Any, output: str, ctx: ToolContext) -> str:
     """Extract page content in the requested format."""
     if output == "screenshot":
-        data = page.screenshot(type="png", full_page=False)
-        b64 = base64.b64encode(data).decode()
-        ctx.browser_state.last_screenshot_b64 = b64
-        return (
-            f"Screenshot captured ({len(b64)} bytes base64). "
-            f"Call send_photo(image_base64='__last_screenshot__') to deliver it to the owner."
-        )
+        return _take_screenshot(page, ctx)
     elif output == "html":
         html = page.content()
         return html[:50000] + ("... [truncated]" if len(html) > 50000 else "")
     elif output == "markdown":
-        text = page.evaluate(_MARKDOWN_JS)
-        return text[:30000] + ("... [truncated]" if len(text) > 30000 else "")
+        text = page.evaluate(_MARKDOWN_JS, _MARKDOWN_MAX_CHARS)
+        return text[:_MARKDOWN_MAX_CHARS] + ("... [truncated]" if len(text) > _MARKDOWN_MAX_CHARS else "")
     else:  # text
         text = page.inner_text("body")
         return text[:30000] + ("... [truncated]" if len(text) > 30000 else "")
@@ -245,22 +342,23 @@ def _extract_page_output(page: Any, output: str, ctx: ToolContext) -> str:
 
 def _browse_page(ctx: ToolContext, url: str, output: str = "text",
                  wait_for: str = "", timeout: int = 30000) -> str:
-    try:
+    def _load() -> str:
         page = _ensure_browser(ctx)
+        # Screenshots need the full page; other outputs only read the DOM
+        _set_resource_blocking(page, ctx, output != "screenshot")
         page.goto(url, timeout=timeout, wait_until="domcontentloaded")
         if wait_for:
             page.wait_for_selector(wait_for, timeout=timeout)
         return _extract_page_output(page, output, ctx)
+
+    try:
+        return _load()
     except Exception as e:
         if "cannot switch" in str(e) or "different thread" in str(e) or "greenlet" in str(e).lower():
             log.warning(f"Browser thread error detected: {e}. Resetting Playwright and retrying...")
             cleanup_browser(ctx)
             _reset_playwright_greenlet()
-            page = _ensure_browser(ctx)
-            page.goto(url, timeout=timeout, wait_until="domcontentloaded")
-            if wait_for:
-                page.wait_for_selector(wait_for, timeout=timeout)
-            return _extract_page_output(page, output, ctx)
+            return _load()
         raise
 
 
@@ -286,13 +384,14 @@ def _browser_action(ctx: ToolContext, action: str, selector: str = "",
             page.select_option(selector, value, timeout=timeout)
             return f"Selected {value} in {selector}"
         elif action == "screenshot":
-            data = page.screenshot(type="png", full_page=False)
-            b64 = base64.b64encode(data).decode()
-            ctx.browser_state.last_screenshot_b64 = b64
-            return (
-                f"Screenshot captured ({len(b64)} bytes base64). "
-                f"Call send_photo(image_base64='__last_screenshot__') to deliver it to the owner."
-            )
+            # No reload: it would lose form/SPA/scroll state and could resubmit
+            # a POST. Later navigations load in full once the filter is off.
+            if _set_resource_blocking(page, ctx, False):
+                return _take_screenshot(page, ctx) + (
+                    " Note: this page was opened for text, so images, fonts and media "
+                    "are missing from this capture; pages loaded from now on include them."
+                )
+            return _take_screenshot(page, ctx)
         elif action == "evaluate":
             if not value:
                 return "Error: value (JS code) required for evaluate"
@@ -337,6 +436,7 @@ def get_tools() -> List[ToolEntry]:
                     "Open a URL in headless browser. Returns page content as text, "
                     "html, markdown, or screenshot (base64 PNG). "
                     "Browser persists across calls within a task. "
+                    "Non-screenshot loads skip images, fonts and media. "
                     "For screenshots: use send_photo tool to deliver the image to owner."
                 ),
                 "parameters": {
@@ -370,7 +470,8 @@ def get_tools() -> List[ToolEntry]:
                 "description": (
                     "Perform action on current browser page. Actions: "
                     "click (selector), fill (selector + value), select (selector + value), "
-                    "screenshot (base64 PNG), evaluate (JS code in value), "
+                    "screenshot (base64 PNG; on a page opened for text, images are missing until the next load), "
+                    "evaluate (JS code in value), "
                     "scroll (value: up/down/top/bottom)."
                 ),
                 "parameters": {
@@ -7,40 +7,81 @@ import json
 import logging
 import os
 import pathlib
+import stat
+import time
 import uuid
 from typing import Any, Dict, List, Tuple
 
 from ouroboros.tools.registry import ToolContext, ToolEntry
 from ouroboros.utils import read_text, safe_relpath, utc_now_iso
 
+try:
+    import orjson  # optional: faster listing serialization
+except ImportError:
+    orjson = None
+
 log = logging.getLogger(__name__)
 
 
+# (root, target, max_entries, dir mtime_ns) → listing. A directory's mtime
+# changes whenever an entry is added, removed or renamed, so a hit is exact.
+_LS_CACHE: Dict[Tuple[str, str, int, int], List[str]] = {}
+_LS_CACHE_MAX = 256
+# Listings of directories modified this recently are not cached: on coarse
+# mtime filesystems (Drive FUSE) a second change could keep the same mtime.
+_LS_RACY_NS = 2_000_000_000
+
+
 def _list_dir(root: pathlib.Path, rel: str, max_entries: int = 500) -> List[str]:
     target = (root / safe_relpath(rel)).resolve()
-    if not target.exists():
+    try:
+        st = target.stat()
+    except OSError:
         return [f"⚠️ Directory not found: {rel}"]
-    if not target.is_dir():
+    if not stat.S_ISDIR(st.st_mode):
         return [f"⚠️ Not a directory: {rel}"]
+    key = (str(root), str(target), max_entries, st.st_mtime_ns)
+    cached = _LS_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+
     items = []
     try:
-        for entry in sorted(target.iterdir()):
+        rel_dir = target.relative_to(root).as_posix()
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        # scandir: DirEntry.is_dir() uses d_type, no Path object or stat per entry
+        with os.scandir(target) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
             if len(items) >= max_entries:
                 items.append(f"...(truncated at {max_entries})")
                 break
             suffix = "/" if entry.is_dir() else ""
-            items.append(str(entry.relative_to(root)) + suffix)
+            items.append(prefix + entry.name + suffix)
     except Exception as e:
         items.append(f"⚠️ Error listing: {e}")
+        return items
+
+    if time.time_ns() - st.st_mtime_ns > _LS_RACY_NS:
+        if len(_LS_CACHE) >= _LS_CACHE_MAX:
+            _LS_CACHE.pop(next(iter(_LS_CACHE)))
+        _LS_CACHE[key] = list(items)
     return items
 
 
+def _dumps_listing(items: List[str]) -> str:
+    """Pretty JSON for a listing; byte-identical to json.dumps(indent=2, ensure_ascii=False)."""
+    if orjson is not None:
+        return orjson.dumps(items, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(items, ensure_ascii=False, indent=2)
+
+
 def _repo_read(ctx: ToolContext, path: str) -> str:
     return read_text(ctx.repo_path(path))
 
 
 def _repo_list(ctx: ToolContext, dir: str = ".", max_entries: int = 500) -> str:
-    return json.dumps(_list_dir(ctx.repo_dir, dir, max_entries), ensure_ascii=False, indent=2)
+    return _dumps_listing(_list_dir(ctx.repo_dir, dir, max_entries))
 
 
 def _drive_read(ctx: ToolContext, path: str) -> str:
@@ -48,7 +89,7 @@ def _drive_read(ctx: ToolContext, path: str) -> str:
 
 
 def _drive_list(ctx: ToolContext, dir: str = ".", max_entries: int = 500) -> str:
-    return json.dumps(_list_dir(ctx.drive_root, dir, max_entries), ensure_ascii=False, indent=2)
+    return _dumps_listing(_list_dir(ctx.drive_root, dir, max_entries))
 
 
 def _drive_write(ctx: ToolContext, path: str, content: str, mode: str = "overwrite") -> str:
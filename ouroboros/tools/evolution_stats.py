@@ -19,16 +19,27 @@ import os
 import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson  # optional: faster serialization of the pushed payload
+except ImportError:
+    orjson = None
+
 log = logging.getLogger(__name__)
 
 _VERSION_RE = re.compile(r"v(\d+\.\d+\.\d+)")
 _REPO_DIR = Path(os.environ.get("OUROBOROS_REPO_DIR", "/content/ouroboros_repo"))
 
+# "<contents url>@<branch>" → blob sha returned by our last successful PUT
+_BLOB_SHAS: dict[str, str] = {}
+_SESSION = None
+
 # How many data-points to generate (sampled across full history)
 MAX_POINTS = 100
+_COLLECT_WORKERS = 8
 
 # ── Evolution tab HTML (injected into app.html) ────────────────────────────────
 _EVOLUTION_NAV = '<div class="nav-item" data-tab="evolution"><span class="icon">📈</span> Evolution</div>'
@@ -236,6 +247,22 @@ def _extract_version(msg: str) -> str | None:
     return m.group(1) if m else None
 
 
+def _commit_point(c: dict[str, str]) -> dict[str, Any]:
+    """Metrics for one sampled commit."""
+    h = c["hash"]
+    py_lines, module_count = _count_py_lines(h)
+    return {
+        "ts": c["ts"],
+        "hash": h[:8],
+        "msg": c["msg"][:80],
+        "version": _extract_version(c["msg"]),
+        "py_lines": py_lines,
+        "module_count": module_count,
+        "bible_bytes": _get_file_bytes(h, "BIBLE.md", "prompts/BIBLE.md"),
+        "system_bytes": _get_file_bytes(h, "prompts/SYSTEM.md", "SYSTEM.md"),
+    }
+
+
 def _collect_data() -> list[dict[str, Any]]:
     """Walk git history, sample commits, extract metrics."""
     log.info("evolution_stats: reading git log...")
@@ -277,28 +304,17 @@ def _collect_data() -> list[dict[str, Any]]:
     log.info("evolution_stats: processing %d sampled commits...", len(selected))
     t0 = time.time()
 
+    # Each point is a few dozen git subprocesses (and, in the blobless boot
+    # clone, lazy blob fetches), so commits are processed on a small pool.
     points: list[dict[str, Any]] = []
-    for pos, idx in enumerate(selected):
-        c = all_commits[idx]
-        h = c["hash"]
-        py_lines, module_count = _count_py_lines(h)
-        bible_bytes = _get_file_bytes(h, "BIBLE.md", "prompts/BIBLE.md")
-        system_bytes = _get_file_bytes(h, "prompts/SYSTEM.md", "SYSTEM.md")
-        points.append({
-            "ts": c["ts"],
-            "hash": h[:8],
-            "msg": c["msg"][:80],
-            "version": _extract_version(c["msg"]),
-            "py_lines": py_lines,
-            "module_count": module_count,
-            "bible_bytes": bible_bytes,
-            "system_bytes": system_bytes,
-        })
-        if (pos + 1) % 10 == 0:
-            log.info(
-                "evolution_stats: %d/%d done (%.1fs)",
-                pos + 1, len(selected), time.time() - t0,
-            )
+    with ThreadPoolExecutor(max_workers=_COLLECT_WORKERS, thread_name_prefix="evo-stats") as pool:
+        for pos, point in enumerate(pool.map(_commit_point, (all_commits[i] for i in selected))):
+            points.append(point)
+            if (pos + 1) % 10 == 0:
+                log.info(
+                    "evolution_stats: %d/%d done (%.1fs)",
+                    pos + 1, len(selected), time.time() - t0,
+                )
 
     log.info("evolution_stats: collected %d points in %.1fs", len(points), time.time() - t0)
     return points
@@ -335,10 +351,35 @@ def _patch_app_html(webapp_dir: Path) -> str:
     return "patched"
 
 
+def _session():
+    """Shared requests.Session: the sha GET and the PUT reuse one TLS connection."""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        session.headers["Accept"] = "application/vnd.github.v3+json"
+        _SESSION = session
+    return _SESSION
+
+
+def _reset_after_fork() -> None:
+    # A forked worker must not reuse the parent's keep-alive sockets
+    global _SESSION
+    _SESSION = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
 def _push_to_github(data: dict[str, Any]) -> str:
     """Push evolution.json to the repo's docs/ folder via GitHub API."""
-    import base64
-    import requests
+    try:
+        import pybase64 as base64  # optional: SIMD base64
+    except ImportError:
+        import base64
 
     token = os.environ.get("GITHUB_TOKEN", "").strip()
     if not token:
@@ -351,18 +392,23 @@ def _push_to_github(data: dict[str, Any]) -> str:
     branch = os.environ.get("GITHUB_BRANCH", "ouroboros")
 
     url = f"https://api.github.com/repos/{repo_slug}/contents/{file_path}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github.v3+json",
-    }
+    headers = {"Authorization": f"Bearer {token}"}
+    session = _session()
+
+    def _remote_sha() -> str | None:
+        r = session.get(url, headers=headers, timeout=15)
+        return r.json().get("sha") if r.status_code == 200 else None
 
-    sha = None
-    r = requests.get(url, headers=headers, timeout=15)
-    if r.status_code == 200:
-        sha = r.json().get("sha")
+    # The PUT response carries the new blob sha, so repeat pushes skip the GET
+    cache_key = f"{url}@{branch}"
+    cached = cache_key in _BLOB_SHAS
+    sha = _BLOB_SHAS[cache_key] if cached else _remote_sha()
 
-    content_str = json.dumps(data, ensure_ascii=False, indent=2)
-    content_b64 = base64.b64encode(content_str.encode("utf-8")).decode("utf-8")
+    if orjson is not None:
+        content_bytes = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content_bytes = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    content_b64 = base64.b64encode(content_bytes).decode("ascii")
 
     payload = {
         "message": f"evolution: {len(data.get('points', []))} data points",
@@ -372,8 +418,20 @@ def _push_to_github(data: dict[str, Any]) -> str:
     if sha:
         payload["sha"] = sha
 
-    put_r = requests.put(url, headers=headers, json=payload, timeout=15)
+    put_r = session.put(url, headers=headers, json=payload, timeout=15)
+    if cached and put_r.status_code in (409, 422):
+        # Cached sha went stale (file changed elsewhere) — refetch once
+        _BLOB_SHAS.pop(cache_key, None)
+        sha = _remote_sha()
+        payload.pop("sha", None)
+        if sha:
+            payload["sha"] = sha
+        put_r = session.put(url, headers=headers, json=payload, timeout=15)
     if put_r.status_code in [200, 201]:
+        try:
+            _BLOB_SHAS[cache_key] = put_r.json()["content"]["sha"]
+        except (ValueError, KeyError, TypeError):
+            _BLOB_SHAS.pop(cache_key, None)
         return f"pushed {len(data.get('points', []))} points to {file_path}"
     return f"error: {put_r.status_code} — {put_r.text[:200]}"
 
@@ -7,7 +7,7 @@ stored in memory/knowledge/ on Drive. Auto-maintains an index file.
 import logging
 import re
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 from ouroboros.tools.registry import ToolEntry, ToolContext
 
@@ -81,10 +81,15 @@ def _extract_summary(text: str, max_chars: int = 150) -> str:
     Skips heading lines (starting with #) and collects up to 3 meaningful
     content sentences/lines, joined with ' | ', capped at max_chars.
     """
-    lines = text.strip().split("\n")
+    # Walk lines with find() and stop after 3 snippets: no full-file split
     snippets = []
-    for line in lines:
-        stripped = line.strip()
+    start, end_of_text = 0, len(text)
+    while start <= end_of_text:
+        end = text.find("\n", start)
+        if end == -1:
+            end = end_of_text
+        stripped = text[start:end].strip()
+        start = end + 1
         if not stripped or stripped.startswith("#"):
             continue
         # Strip markdown list/bold markers for a cleaner snippet
@@ -135,8 +140,12 @@ def _rebuild_index(ctx: ToolContext):
     (kdir / INDEX_FILE).write_text(index_content, encoding="utf-8")
 
 
-def _update_index_entry(ctx: ToolContext, topic: str):
-    """Incrementally update the index for a single topic."""
+def _update_index_entry(ctx: ToolContext, topic: str, text: Optional[str] = None):
+    """Incrementally update the index for a single topic.
+
+    ``text`` is the topic's full content when the caller already has it
+    (overwrite), which saves reading the file back from Drive.
+    """
     kdir = ctx.drive_path(KNOWLEDGE_DIR)
     index_path = kdir / INDEX_FILE
     topic_path = kdir / f"{topic}.md"
@@ -167,9 +176,10 @@ def _update_index_entry(ctx: ToolContext, topic: str):
     entries = [e for e in entries if not e.strip().startswith(pattern)]
 
     # Add new entry if topic file exists
-    if topic_path.exists():
+    if text is not None or topic_path.exists():
         try:
-            text = topic_path.read_text(encoding="utf-8").strip()
+            if text is None:
+                text = topic_path.read_text(encoding="utf-8")
             summary = _extract_summary(text)
             new_entry = f"- **{topic}**: {summary}"
         except Exception:
@@ -236,7 +246,7 @@ def _knowledge_write(ctx: ToolContext, topic: str, content: str, mode: str = "ov
     else:
         path.write_text(content, encoding="utf-8")
 
-    _update_index_entry(ctx, sanitized_topic)
+    _update_index_entry(ctx, sanitized_topic, content if mode == "overwrite" else None)
     return f"✅ Knowledge '{sanitized_topic}' saved ({mode})."
 
 
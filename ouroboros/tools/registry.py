@@ -21,8 +21,10 @@ class BrowserState:
 
     pw_instance: Any = None
     browser: Any = None
+    context: Any = None
     page: Any = None
     last_screenshot_b64: Optional[str] = None
+    block_resources: bool = False  # image/font/media filter is routed on the page
 
 
 @dataclass
@@ -55,6 +57,9 @@ class ToolContext:
     # True when running inside handle_chat_direct (not a queued worker task)
     is_direct_chat: bool = False
 
+    # Resolved drive_root/logs, filled on first drive_logs() call
+    _drive_logs_path: Optional[pathlib.Path] = field(default=None, init=False, repr=False, compare=False)
+
     def repo_path(self, rel: str) -> pathlib.Path:
         return (self.repo_dir / safe_relpath(rel)).resolve()
 
@@ -62,7 +67,9 @@ class ToolContext:
         return (self.drive_root / safe_relpath(rel)).resolve()
 
     def drive_logs(self) -> pathlib.Path:
-        return (self.drive_root / "logs").resolve()
+        if self._drive_logs_path is None:
+            self._drive_logs_path = (self.drive_root / "logs").resolve()
+        return self._drive_logs_path
 
 
 @dataclass
@@ -100,6 +107,11 @@ class ToolRegistry:
 
     def __init__(self, repo_dir: pathlib.Path, drive_root: pathlib.Path):
         self._entries: Dict[str, ToolEntry] = {}
+        # Derived views of _entries, rebuilt lazily after any mutation
+        self._schemas_cache: Dict[bool, List[Dict[str, Any]]] = {}
+        self._code_tools: Optional[frozenset] = None
+        self._names: Optional[List[str]] = None
+        self._sorted_names_csv: Optional[str] = None
         self._ctx = ToolContext(repo_dir=repo_dir, drive_root=drive_root)
         self._load_modules()
 
@@ -120,6 +132,13 @@ class ToolRegistry:
                 import logging
                 logging.getLogger(__name__).warning(
                     "Failed to load tool module %s", modname, exc_info=True)
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._schemas_cache.clear()
+        self._code_tools = None
+        self._names = None
+        self._sorted_names_csv = None
 
     def set_context(self, ctx: ToolContext) -> None:
         self._ctx = ctx
@@ -127,21 +146,29 @@ class ToolRegistry:
     def register(self, entry: ToolEntry) -> None:
         """Register a new tool (for extension by Ouroboros)."""
         self._entries[entry.name] = entry
+        self._invalidate()
 
     # --- Contract ---
 
     def available_tools(self) -> List[str]:
-        return [e.name for e in self._entries.values()]
+        if self._names is None:
+            self._names = [e.name for e in self._entries.values()]
+        return list(self._names)
 
     def schemas(self, core_only: bool = False) -> List[Dict[str, Any]]:
-        if not core_only:
-            return [{"type": "function", "function": e.schema} for e in self._entries.values()]
-        # Core tools + meta-tools for discovering/enabling extended tools
-        result = []
-        for e in self._entries.values():
-            if e.name in CORE_TOOL_NAMES or e.name in ("list_available_tools", "enable_tools"):
-                result.append({"type": "function", "function": e.schema})
-        return result
+        cached = self._schemas_cache.get(core_only)
+        if cached is None:
+            if not core_only:
+                cached = [{"type": "function", "function": e.schema} for e in self._entries.values()]
+            else:
+                # Core tools + meta-tools for discovering/enabling extended tools
+                cached = []
+                for e in self._entries.values():
+                    if e.name in CORE_TOOL_NAMES or e.name in ("list_available_tools", "enable_tools"):
+                        cached.append({"type": "function", "function": e.schema})
+            self._schemas_cache[core_only] = cached
+        # Callers append enabled extra tools to the list they get back
+        return list(cached)
 
     def list_non_core_tools(self) -> List[Dict[str, str]]:
         """Return name+description of all non-core tools."""
@@ -167,7 +194,9 @@ class ToolRegistry:
     def execute(self, name: str, args: Dict[str, Any]) -> str:
         entry = self._entries.get(name)
         if entry is None:
-            return f"⚠️ Unknown tool: {name}. Available: {', '.join(sorted(self._entries.keys()))}"
+            if self._sorted_names_csv is None:
+                self._sorted_names_csv = ", ".join(sorted(self._entries))
+            return f"⚠️ Unknown tool: {name}. Available: {self._sorted_names_csv}"
         try:
             return entry.handler(self._ctx, **args)
         except TypeError as e:
@@ -185,7 +214,10 @@ class ToolRegistry:
                 handler=handler,
                 timeout_sec=entry.timeout_sec,
             )
+            self._invalidate()
 
     @property
     def CODE_TOOLS(self) -> frozenset:
-        return frozenset(e.name for e in self._entries.values() if e.is_code_tool)
+        if self._code_tools is None:
+            self._code_tools = frozenset(e.name for e in self._entries.values() if e.is_code_tool)
+        return self._code_tools
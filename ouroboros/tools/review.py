@@ -8,7 +8,6 @@ import os
 import json
 import asyncio
 import logging
-import httpx
 
 from ouroboros.utils import utc_now_iso
 from ouroboros.tools.registry import ToolEntry, ToolContext
@@ -164,6 +163,9 @@ async def _multi_model_review_async(content: str, prompt: str, models: list, ctx
         {"role": "user", "content": content},
     ]
 
+    # Imported here: httpx costs ~25ms and every ToolRegistry imports this module
+    import httpx
+
     # Query all models with bounded concurrency (OpenRouter path)
     semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
     async with httpx.AsyncClient() as client:
@@ -183,41 +185,13 @@ async def _multi_model_review_async(content: str, prompt: str, models: list, ctx
     }
 
 
-async def _multi_model_review_antigravity(content: str, prompt: str, models: list, ctx: ToolContext):
-    """Run multi-model review via Antigravity backend."""
-    from ouroboros.antigravity_client import AntigravityClient
-    ag = AntigravityClient()
-    messages = [
-        {"role": "system", "content": prompt},
-        {"role": "user", "content": content},
-    ]
-
-    review_results = []
-    for model in models:
+async def _review_antigravity_one(ag, model: str, messages: list, semaphore) -> dict:
+    """Query one model via Antigravity under the shared semaphore. Returns review_result dict."""
+    async with semaphore:
         try:
-            msg, usage = ag.chat(messages=messages, model=model, max_tokens=4096)
-            text = msg.get("content") or "(empty response)"
-            # Parse verdict
-            verdict = "UNKNOWN"
-            for line in text.split("\n")[:3]:
-                upper = line.upper()
-                if "PASS" in upper:
-                    verdict = "PASS"
-                    break
-                elif "FAIL" in upper:
-                    verdict = "FAIL"
-                    break
-
-            review_result = {
-                "model": model,
-                "verdict": verdict,
-                "text": text,
-                "tokens_in": usage.get("prompt_tokens", 0),
-                "tokens_out": usage.get("completion_tokens", 0),
-                "cost_estimate": 0.0,  # Antigravity is free
-            }
+            msg, usage = await ag.achat(messages=messages, model=model, max_tokens=4096)
         except Exception as e:
-            review_result = {
+            return {
                 "model": model,
                 "verdict": "ERROR",
                 "text": f"Error: {str(e)[:200]}",
@@ -225,12 +199,50 @@ async def _multi_model_review_antigravity(content: str, prompt: str, models: lis
                 "tokens_out": 0,
                 "cost_estimate": 0.0,
             }
+    text = msg.get("content") or "(empty response)"
+    # Parse verdict
+    verdict = "UNKNOWN"
+    for line in text.split("\n")[:3]:
+        upper = line.upper()
+        if "PASS" in upper:
+            verdict = "PASS"
+            break
+        elif "FAIL" in upper:
+            verdict = "FAIL"
+            break
+    return {
+        "model": model,
+        "verdict": verdict,
+        "text": text,
+        "tokens_in": usage.get("prompt_tokens", 0),
+        "tokens_out": usage.get("completion_tokens", 0),
+        "cost_estimate": 0.0,  # Antigravity is free
+    }
+
+
+async def _multi_model_review_antigravity(content: str, prompt: str, models: list, ctx: ToolContext):
+    """Run multi-model review via Antigravity backend (models queried concurrently)."""
+    from ouroboros.antigravity_client import AntigravityClient
+    ag = AntigravityClient()
+    messages = [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": content},
+    ]
+
+    semaphore = asyncio.Semaphore(CONCURRENCY_LIMIT)
+    try:
+        review_results = await asyncio.gather(
+            *[_review_antigravity_one(ag, m, messages, semaphore) for m in models])
+    finally:
+        # The handler runs us under a fresh asyncio.run loop — close its client
+        await ag.aclose()
+
+    for review_result in review_results:
         _emit_usage_event(review_result, ctx)
-        review_results.append(review_result)
 
     return {
         "model_count": len(models),
-        "results": review_results,
+        "results": list(review_results),
     }
 
 
@@ -49,9 +49,25 @@ def write_text(path: pathlib.Path, content: str) -> None:
     path.write_text(content, encoding="utf-8")
 
 
+# path → lock file path. resolve() + sha256 + mkdir run once per log file
+# instead of on every event.
+_JSONL_LOCK_PATHS: Dict[str, pathlib.Path] = {}
+
+
+def _jsonl_lock_path(path: pathlib.Path) -> pathlib.Path:
+    key = str(path)
+    lock_path = _JSONL_LOCK_PATHS.get(key)
+    if lock_path is None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path_hash = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
+        lock_path = path.parent / f".append_jsonl_{path_hash}.lock"
+        _JSONL_LOCK_PATHS[key] = lock_path
+    return lock_path
+
+
 def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
     """Append a JSON object as a line to a JSONL file (concurrent-safe)."""
-    path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = _jsonl_lock_path(path)
     line = json.dumps(obj, ensure_ascii=False)
     data = (line + "\n").encode("utf-8")
 
@@ -61,8 +77,6 @@ def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
     write_retries = 3
     retry_sleep_base_sec = 0.01
 
-    path_hash = hashlib.sha256(str(path.resolve()).encode("utf-8")).hexdigest()[:12]
-    lock_path = path.parent / f".append_jsonl_{path_hash}.lock"
     lock_fd = None
     lock_acquired = False
 
@@ -95,6 +109,9 @@ def append_jsonl(path: pathlib.Path, obj: Dict[str, Any]) -> None:
                 finally:
                     os.close(fd)
                 return
+            except FileNotFoundError:
+                # Log dir removed since it was first created — recreate and retry
+                path.parent.mkdir(parents=True, exist_ok=True)
             except Exception:
                 if attempt < write_retries - 1:
                     time.sleep(retry_sleep_base_sec * (2 ** attempt))
@@ -2,17 +2,56 @@
 """
 BRUTE-FORCE model name scanner for Cloud Code / Antigravity API.
 Tries every combination of model name × suffix × thinkingConfig × tools.
-Run: python test_thought_sig.py
+Run: python test_thought_sig.py [--skip-known-404]
+
+Names that returned 404 are remembered per project in KNOWN_404_FILE (and
+forgotten once they answer). Every name is scanned by default; with
+--skip-known-404 the remembered ones are skipped for a faster rescan.
 """
 from __future__ import annotations
-import json, sys, uuid, time, requests
-from itertools import product
+import json, pathlib, sys, threading, time, uuid, requests
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count, product
+
+try:
+    import orjson
+    _loads, _dumps = orjson.loads, orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
 
 sys.path.insert(0, "/content/ouroboros_repo")
 from ouroboros.antigravity_auth import get_access_token, get_project_id
 
 ENDPOINT = "https://cloudcode-pa.googleapis.com"
 
+# One pooled keep-alive session for the whole scan (a TLS handshake per call otherwise)
+SESSION = requests.Session()
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=16))
+SESSION.headers["Content-Type"] = "application/json"
+
+KNOWN_404_FILE = pathlib.Path.home() / ".cache" / "ouroboros_scanner_404.json"
+
+# Probes are pure network waits; run this many at once (results print in order).
+# Request starts stay PACE_SEC apart across all workers, the same rate as
+# the old sequential loop's sleep, so the overlap doesn't trigger 429s.
+WORKERS = 4
+PACE_SEC = 0.1
+_pace_lock = threading.Lock()
+_next_start = 0.0
+
+
+def _pace():
+    """Block until this thread may start its request."""
+    global _next_start
+    with _pace_lock:
+        now = time.monotonic()
+        wait = _next_start - now
+        _next_start = max(now, _next_start) + PACE_SEC
+    if wait > 0:
+        time.sleep(wait)
+
 # ── All possible model name bases ─────────────────────────────────────
 BASES = [
     # Gemini 3.1
@@ -47,6 +86,9 @@ SUFFIXES = [
     "-latest",
 ]
 
+# Phase 1 matrix: every base × suffix, assembled once
+MODEL_MATRIX = tuple(b + s for b, s in product(BASES, SUFFIXES))
+
 # ── ThinkingConfig variants ───────────────────────────────────────────
 THINKING_CONFIGS = {
     "none":  None,
@@ -64,47 +106,60 @@ SIMPLE_TOOLS = [{"functionDeclarations": [{
     "parameters": {"type": "object", "properties": {}},
 }]}]
 
+# Per-call invariants, built once: a generationConfig per thinking variant
+# and the static envelope fields
+GEN_CONFIGS = {
+    key: ({"maxOutputTokens": 256, "temperature": 1.0, "thinkingConfig": tc} if tc is not None
+          else {"maxOutputTokens": 256, "temperature": 1.0})
+    for key, tc in THINKING_CONFIGS.items()
+}
+STATIC_BODY = {"requestType": "agent", "userAgent": "antigravity"}
+
+# requestId only needs to be unique within a run: random prefix + counter
+_RID_PREFIX = uuid.uuid4().hex[:8]
+_RID_COUNTER = count(1)
+
 
 def call(model, thinking_key="none", with_tools=False):
     """Single API call. Returns (status, short_info)."""
     token = get_access_token()
     project = get_project_id() or ""
 
-    gen_config = {"maxOutputTokens": 256, "temperature": 1.0}
-    tc = THINKING_CONFIGS[thinking_key]
-    if tc is not None:
-        gen_config["thinkingConfig"] = tc
-
-    inner = {"contents": SIMPLE_CONTENTS, "generationConfig": gen_config}
+    request = {"model": model, "contents": SIMPLE_CONTENTS,
+               "generationConfig": GEN_CONFIGS[thinking_key]}
     if with_tools:
-        inner["tools"] = SIMPLE_TOOLS
+        request["tools"] = SIMPLE_TOOLS
 
     body = {
-        "project": project, "model": model,
-        "request": {"model": model, **inner},
-        "requestType": "agent", "userAgent": "antigravity",
-        "requestId": f"scan-{uuid.uuid4()}",
+        "project": project, "model": model, "request": request,
+        **STATIC_BODY,
+        "requestId": f"scan-{_RID_PREFIX}-{next(_RID_COUNTER)}",
     }
 
+    _pace()
     try:
-        r = requests.post(
+        r = SESSION.post(
             f"{ENDPOINT}/v1internal:generateContent",
-            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
-            json=body, timeout=15,
+            headers={"Authorization": f"Bearer {token}"},
+            data=_dumps(body), timeout=15,
         )
         if r.status_code == 200:
-            d = r.json()
+            d = _loads(r.content)
             if "response" in d and "candidates" in d["response"]:
                 d = d["response"]
             parts = d.get("candidates", [{}])[0].get("content", {}).get("parts", [])
-            fc = sum(1 for p in parts if "functionCall" in p)
-            ts = sum(1 for p in parts if "thoughtSignature" in p)
-            txt = sum(len(p.get("text", "")) for p in parts)
+            fc = ts = txt = 0
+            for p in parts:
+                if "functionCall" in p:
+                    fc += 1
+                if "thoughtSignature" in p:
+                    ts += 1
+                txt += len(p.get("text", ""))
             return 200, f"p={len(parts)} fc={fc} ts={ts} txt={txt}"
         else:
             # Extract short error
             try:
-                msg = r.json().get("error", {}).get("message", "")[:80]
+                msg = _loads(r.content).get("error", {}).get("message", "")[:80]
             except Exception:
                 msg = r.text[:80]
             return r.status_code, msg
@@ -112,7 +167,21 @@ def call(model, thinking_key="none", with_tools=False):
         return -1, str(e)[:60]
 
 
+def load_known_404() -> dict:
+    """{project: [model, ...]} of names that 404'd in earlier runs."""
+    try:
+        return json.loads(KNOWN_404_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_known_404(known: dict) -> None:
+    KNOWN_404_FILE.parent.mkdir(parents=True, exist_ok=True)
+    KNOWN_404_FILE.write_text(json.dumps(known, indent=1, sort_keys=True), encoding="utf-8")
+
+
 def main():
+    skip_known = "--skip-known-404" in sys.argv[1:]
     token = get_access_token()
     project = get_project_id()
     print(f"Project: {project}")
@@ -128,23 +197,37 @@ def main():
     print("PHASE 1: Model existence scan (no thinking, no tools)")
     print("=" * 80)
 
+    known = load_known_404()
+    known_404 = set(known.get(project, ()))
+    models = [m for m in MODEL_MATRIX if not (skip_known and m in known_404)]
+    if len(models) < len(MODEL_MATRIX):
+        print(f"  (--skip-known-404: skipping {len(MODEL_MATRIX) - len(models)} names that 404'd before)")
+
     found = []
-    total = len(BASES) * len(SUFFIXES)
-    i = 0
-    for base in BASES:
-        for suffix in SUFFIXES:
-            model = base + suffix
-            i += 1
-            status, info = call(model, "none", False)
-            tag = "✅" if status == 200 else ("⚠️" if status == 400 else "  ")
-            if status not in (403, 404):
-                print(f"  {tag} [{i:3d}/{total}] {model:50s} → {status} | {info}")
-                found.append(model)
-            # Small delay to avoid rate limiting
-            time.sleep(0.1)
+    rate_limited = []  # 429 says nothing about whether the name exists
+    total = len(models)
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = pool.map(lambda m: call(m, "none", False), models)
+        for i, (model, (status, info)) in enumerate(zip(models, results), 1):
+            if status == 404:
+                known_404.add(model)
+            elif status == 429:  # inconclusive: keep what we knew
+                print(f"  ⏳ [{i:3d}/{total}] {model:50s} → 429 (inconclusive)")
+                rate_limited.append(model)
+            else:
+                known_404.discard(model)  # answered, so no longer a known 404
+                if status != 403:
+                    tag = "✅" if status == 200 else ("⚠️" if status == 400 else "  ")
+                    print(f"  {tag} [{i:3d}/{total}] {model:50s} → {status} | {info}")
+                    found.append(model)
+    known[project] = sorted(known_404)
+    save_known_404(known)
+
+    if rate_limited:
+        print(f"\n  ⏳ {len(rate_limited)} names were rate-limited (429); rerun later to check them")
 
     if not found:
-        print("\n  ❌ NO models responded with anything other than 403/404!")
+        print("\n  ❌ NO models responded with anything other than 403/404/429!")
         print("     Either the API is down or auth is broken.")
         return
 
@@ -159,15 +242,16 @@ def main():
     print("=" * 80)
 
     working = []  # (model, thinking_key) pairs that return 200
-    for model in found:
-        print(f"\n  {model}:")
-        for tk in THINKING_CONFIGS:
-            status, info = call(model, tk, False)
+    combos = [(model, tk) for model in found for tk in THINKING_CONFIGS]
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = pool.map(lambda c: call(c[0], c[1], False), combos)
+        for (model, tk), (status, info) in zip(combos, results):
+            if tk == next(iter(THINKING_CONFIGS)):
+                print(f"\n  {model}:")
             tag = "✅" if status == 200 else "❌"
             print(f"    {tag} think={tk:8s} → {status} | {info}")
             if status == 200:
                 working.append((model, tk))
-            time.sleep(0.1)
 
     # ═══════════════════════════════════════════════════════════════════
     # PHASE 3: For working combos, test with tools
@@ -178,11 +262,11 @@ def main():
         print("PHASE 3: Tools for working model+thinking combos")
         print("=" * 80)
 
-        for model, tk in working:
-            status, info = call(model, tk, True)
-            tag = "✅" if status == 200 else "❌"
-            print(f"  {tag} {model:50s} think={tk:8s} tools=yes → {status} | {info}")
-            time.sleep(0.1)
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            results = pool.map(lambda c: call(c[0], c[1], True), working)
+            for (model, tk), (status, info) in zip(working, results):
+                tag = "✅" if status == 200 else "❌"
+                print(f"  {tag} {model:50s} think={tk:8s} tools=yes → {status} | {info}")
 
     # ═══════════════════════════════════════════════════════════════════
     # SUMMARY
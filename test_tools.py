@@ -1,6 +1,23 @@
 #!/usr/bin/env python3
-"""Test Antigravity API with tools to diagnose 404/400."""
-import json, sys, os, uuid
+"""Test Antigravity API with tools to diagnose 404/400.
+
+With TEST_TOOLS_CACHE=1, tests whose exact body passed in the last
+RESULT_TTL_SEC seconds are reported from a local cache instead of re-sent.
+"""
+import hashlib, json, sys, os, secrets, time
+from pathlib import Path
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _loads, _dumps = orjson.loads, orjson.dumps
+except ImportError:
+    _loads = json.loads
+    def _dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
 
 # Must have TOKEN_DIR set
 os.environ.setdefault("OUROBOROS_TOKEN_DIR", "/tmp/ouroboros_tokens")
@@ -12,181 +29,164 @@ token = get_access_token()
 project_id = get_project_id()
 headers = _get_headers(token)
 
-# Test 1: Simple call without tools (should work)
-print("=" * 60)
-print("TEST 1: Simple call WITHOUT tools")
-body_simple = {
-    "project": project_id,
-    "model": "gemini-3.1-pro-high",
-    "request": {
-        "model": "gemini-3.1-pro-high",
-        "contents": [{"role": "user", "parts": [{"text": "Say 'hello'"}]}],
-        "generationConfig": {
-            "maxOutputTokens": 256,
-            "temperature": 1.0,
-            "thinkingConfig": {"thinkingLevel": "high"},
-        },
-    },
-    "requestType": "agent",
-    "userAgent": "antigravity",
-    "requestId": f"test-{uuid.uuid4()}",
-}
+# One keep-alive session for all tests: the TLS handshakes are paid once.
+# Bodies are posted pre-encoded; Content-Type comes from _get_headers().
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=Retry(
+    # Transient 429/5xx are retried with backoff; if they persist the last
+    # response is still reported (raise_on_status=False) instead of raising.
+    # POST retries are intended: these generateContent probes have no side
+    # effects, so resending one is safe. (Works on urllib3 1.26 and 2.x.)
+    total=4, connect=3, read=3, backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504), allowed_methods=frozenset({"POST"}),
+    respect_retry_after_header=True, raise_on_status=False,
+)))
+session.headers.update(headers)
+
+GET_TIME_TOOL = [{"functionDeclarations": [{
+    "name": "get_time",
+    "description": "Get the current time",
+    "parameters": {"type": "object", "properties": {}},
+}]}]
+
+WHAT_TIME = [{"role": "user", "parts": [{"text": "What time is it?"}]}]
+
+
+def make_body(model, contents, tools=None, thinking=True, max_tokens=256):
+    """generateContent envelope for one test."""
+    request = {"model": model, "contents": contents}
+    if tools:
+        request["tools"] = tools
+    gen = {"maxOutputTokens": max_tokens, "temperature": 1.0}
+    if thinking:
+        gen["thinkingConfig"] = {"thinkingLevel": "high"}
+    request["generationConfig"] = gen
+    return {
+        "project": project_id,
+        "model": model,
+        "request": request,
+        "requestType": "agent",
+        "userAgent": "antigravity",
+        "requestId": "test-" + secrets.token_hex(16),
+    }
+
+
+TESTS = [
+    # Simple call without tools (should work)
+    ("Simple call WITHOUT tools",
+     make_body("gemini-3.1-pro-high", [{"role": "user", "parts": [{"text": "Say 'hello'"}]}])),
+    # Function declarations, no tool results
+    ("Call WITH tools (functionDeclarations)",
+     make_body("gemini-3.1-pro-high", WHAT_TIME, GET_TIME_TOOL)),
+    # Same but without thinkingConfig
+    ("Call WITH tools but WITHOUT thinkingConfig",
+     make_body("gemini-3.1-pro-high", WHAT_TIME, GET_TIME_TOOL, thinking=False)),
+    # Tool results: functionCall + functionResponse in history
+    ("With functionCall + functionResponse in history",
+     make_body("gemini-3.1-pro-high", WHAT_TIME + [
+         {"role": "model", "parts": [{"functionCall": {"name": "get_time", "args": {}}}]},
+         {"role": "user", "parts": [{"functionResponse": {"name": "get_time", "response": {"result": "12:00 PM"}}}]},
+     ], GET_TIME_TOOL)),
+    ("claude-sonnet-4-6 with tools",
+     make_body("claude-sonnet-4-6", WHAT_TIME, GET_TIME_TOOL, thinking=False, max_tokens=16384)),
+]
 
-import requests
 url = f"{ENDPOINTS[0]}/v1internal:generateContent"
 
-resp = requests.post(url, headers=headers, json=body_simple, timeout=30)
-print(f"Status: {resp.status_code}")
-if resp.status_code == 200:
-    data = resp.json()
-    if "response" in data:
-        data = data["response"]
-    candidates = data.get("candidates", [])
-    if candidates:
-        text = candidates[0].get("content", {}).get("parts", [{}])[0].get("text", "")
-        print(f"Response: {text[:100]}")
-    print("✅ TEST 1 PASSED")
-else:
-    print(f"Response: {resp.text[:300]}")
-    print("❌ TEST 1 FAILED")
-
-# Test 2: Call WITH tools (function declarations) - no tool results
-print("\n" + "=" * 60)
-print("TEST 2: Call WITH tools (functionDeclarations)")
-body_tools = {
-    "project": project_id,
-    "model": "gemini-3.1-pro-high",
-    "request": {
-        "model": "gemini-3.1-pro-high",
-        "contents": [{"role": "user", "parts": [{"text": "What time is it?"}]}],
-        "tools": [{"functionDeclarations": [{
-            "name": "get_time",
-            "description": "Get the current time",
-            "parameters": {"type": "object", "properties": {}},
-        }]}],
-        "generationConfig": {
-            "maxOutputTokens": 256,
-            "temperature": 1.0,
-            "thinkingConfig": {"thinkingLevel": "high"},
-        },
-    },
-    "requestType": "agent",
-    "userAgent": "antigravity",
-    "requestId": f"test-{uuid.uuid4()}",
-}
-
-resp = requests.post(url, headers=headers, json=body_tools, timeout=30)
-print(f"Status: {resp.status_code}")
-if resp.status_code == 200:
-    print(f"Response preview: {resp.text[:200]}")
-    print("✅ TEST 2 PASSED")
-else:
-    print(f"Response: {resp.text[:300]}")
-    print("❌ TEST 2 FAILED")
-
-# Test 3: Same but WITHOUT thinkingConfig
-print("\n" + "=" * 60)
-print("TEST 3: Call WITH tools but WITHOUT thinkingConfig")
-body_no_think = {
-    "project": project_id,
-    "model": "gemini-3.1-pro-high",
-    "request": {
-        "model": "gemini-3.1-pro-high",
-        "contents": [{"role": "user", "parts": [{"text": "What time is it?"}]}],
-        "tools": [{"functionDeclarations": [{
-            "name": "get_time",
-            "description": "Get the current time",
-            "parameters": {"type": "object", "properties": {}},
-        }]}],
-        "generationConfig": {
-            "maxOutputTokens": 256,
-            "temperature": 1.0,
-        },
-    },
-    "requestType": "agent",
-    "userAgent": "antigravity",
-    "requestId": f"test-{uuid.uuid4()}",
-}
-
-resp = requests.post(url, headers=headers, json=body_no_think, timeout=30)
-print(f"Status: {resp.status_code}")
-if resp.status_code == 200:
-    print(f"Response preview: {resp.text[:200]}")
-    print("✅ TEST 3 PASSED")
-else:
-    print(f"Response: {resp.text[:300]}")
-    print("❌ TEST 3 FAILED")
-
-# Test 4: With tool results (functionCall + functionResponse in history)
-print("\n" + "=" * 60)
-print("TEST 4: With functionCall + functionResponse in history")
-body_fn = {
-    "project": project_id,
-    "model": "gemini-3.1-pro-high",
-    "request": {
-        "model": "gemini-3.1-pro-high",
-        "contents": [
-            {"role": "user", "parts": [{"text": "What time is it?"}]},
-            {"role": "model", "parts": [{"functionCall": {"name": "get_time", "args": {}}}]},
-            {"role": "user", "parts": [{"functionResponse": {"name": "get_time", "response": {"result": "12:00 PM"}}}]},
-        ],
-        "tools": [{"functionDeclarations": [{
-            "name": "get_time",
-            "description": "Get the current time",
-            "parameters": {"type": "object", "properties": {}},
-        }]}],
-        "generationConfig": {
-            "maxOutputTokens": 256,
-            "temperature": 1.0,
-            "thinkingConfig": {"thinkingLevel": "high"},
-        },
-    },
-    "requestType": "agent",
-    "userAgent": "antigravity",
-    "requestId": f"test-{uuid.uuid4()}",
-}
-
-resp = requests.post(url, headers=headers, json=body_fn, timeout=30)
-print(f"Status: {resp.status_code}")
-if resp.status_code == 200:
-    print(f"Response preview: {resp.text[:200]}")
-    print("✅ TEST 4 PASSED")
-else:
-    print(f"Response: {resp.text[:300]}")
-    print("❌ TEST 4 FAILED")
-
-# Test 5: claude-sonnet-4-6 with tools
-print("\n" + "=" * 60)
-print("TEST 5: claude-sonnet-4-6 with tools")
-body_claude = {
-    "project": project_id,
-    "model": "claude-sonnet-4-6",
-    "request": {
-        "model": "claude-sonnet-4-6",
-        "contents": [{"role": "user", "parts": [{"text": "What time is it?"}]}],
-        "tools": [{"functionDeclarations": [{
-            "name": "get_time",
-            "description": "Get the current time",
-            "parameters": {"type": "object", "properties": {}},
-        }]}],
-        "generationConfig": {
-            "maxOutputTokens": 16384,
-            "temperature": 1.0,
-        },
-    },
-    "requestType": "agent",
-    "userAgent": "antigravity",
-    "requestId": f"test-{uuid.uuid4()}",
-}
-
-resp = requests.post(url, headers=headers, json=body_claude, timeout=30)
-print(f"Status: {resp.status_code}")
-if resp.status_code == 200:
-    print(f"Response preview: {resp.text[:200]}")
-    print("✅ TEST 5 PASSED")
-else:
-    print(f"Response: {resp.text[:300]}")
-    print("❌ TEST 5 FAILED")
-
-print("\n" + "=" * 60)
-print("DONE")
+USE_RESULT_CACHE = os.environ.get("TEST_TOOLS_CACHE") == "1"
+RESULT_CACHE = Path(os.environ["OUROBOROS_TOKEN_DIR"]) / "test_tools_cache.json"
+RESULT_TTL_SEC = 600
+
+
+def body_key(body):
+    """Hash of the body without its random requestId."""
+    canon = json.dumps({k: v for k, v in body.items() if k != "requestId"},
+                       sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(canon.encode(), digest_size=16).hexdigest()
+
+
+def load_passes():
+    """{body_key: unix time of its last 200}, empty unless TEST_TOOLS_CACHE=1."""
+    if not USE_RESULT_CACHE:
+        return {}
+    try:
+        return json.loads(RESULT_CACHE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_passes(passes):
+    cutoff = time.time() - RESULT_TTL_SEC
+    RESULT_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    RESULT_CACHE.write_text(json.dumps({k: ts for k, ts in passes.items() if ts > cutoff}),
+                            encoding="utf-8")
+
+
+def run(body):
+    # Streamed: previews read only the bytes they print, and each response
+    # goes back to the pool when its `with resp:` block closes it
+    return session.post(url, data=_dumps(body), timeout=30, stream=True)
+
+
+def preview(resp, n):
+    """First n characters of the body (at most 4 UTF-8 bytes each)."""
+    return resp.raw.read(4 * n, decode_content=True).decode("utf-8", "replace")[:n]
+
+
+def first_text(data):
+    """Text of the first candidate's first part; None if the response has none."""
+    data = data.get("response", data)
+    try:
+        return data["candidates"][0]["content"]["parts"][0].get("text", "")
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def header(n, title):
+    return ["=" * 60 if n == 1 else "\n" + "=" * 60, f"TEST {n}: {title}"]
+
+
+def report(n, title, resp):
+    """Lines describing one test's response."""
+    lines = header(n, title)
+    lines.append(f"Status: {resp.status_code}")
+    if resp.status_code == 200:
+        if n == 1:
+            text = first_text(_loads(resp.content))
+            if text is not None:
+                lines.append(f"Response: {text[:100]}")
+        else:
+            lines.append(f"Response preview: {preview(resp, 200)}")
+        lines.append(f"✅ TEST {n} PASSED")
+    else:
+        lines.append(f"Response: {preview(resp, 300)}")
+        lines.append(f"❌ TEST {n} FAILED")
+    return lines
+
+
+passes = load_passes()
+now = time.time()
+keys = [body_key(body) for _, body in TESTS]
+cached = [passes.get(key, 0) > now - RESULT_TTL_SEC for key in keys]
+
+# The tests are independent: send them all at once, report in order.
+# Each test's report goes out as one write as soon as it is ready.
+with session, ThreadPoolExecutor(max_workers=len(TESTS)) as pool:
+    results = pool.map(run, [body for (_, body), hit in zip(TESTS, cached) if not hit])
+    for n, ((title, _), key, hit) in enumerate(zip(TESTS, keys, cached), 1):
+        if hit:
+            lines = header(n, title)
+            lines.append(f"✅ TEST {n} PASSED (cached, {now - passes[key]:.0f}s ago)")
+        else:
+            resp = next(results)
+            with resp:
+                lines = report(n, title, resp)
+            if resp.status_code == 200:
+                passes[key] = now
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+if USE_RESULT_CACHE:
+    save_passes(passes)
+
+sys.stdout.write("\n" + "=" * 60 + "\nDONE\n")
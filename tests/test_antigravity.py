@@ -0,0 +1,491 @@
+"""
+Tests for the Antigravity backend: OAuth token storage and request/response
+conversion. No network access — HTTP calls are never made.
+
+Run: pytest tests/test_antigravity.py -v
+"""
+
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestOAuthState(unittest.TestCase):
+    """Test PKCE / state helpers in antigravity_auth.py."""
+
+    def test_state_roundtrip(self):
+        from ouroboros.antigravity_auth import _encode_state, _decode_state
+        for verifier in ("v", "ab?>", "x" * 64, "~~~?" * 7):
+            state = _encode_state(verifier, "proj")
+            self.assertNotIn("=", state)
+            self.assertEqual(_decode_state(state), (verifier, "proj"))
+
+
+class TestTokenStorage(unittest.TestCase):
+    """Test token file caching in antigravity_auth.py."""
+
+    def setUp(self):
+        from ouroboros import antigravity_auth as auth
+        self.auth = auth
+        self._tmpdir = tempfile.TemporaryDirectory()
+        tmp = pathlib.Path(self._tmpdir.name)
+        self._saved = (auth._TOKEN_DIR, auth._TOKEN_FILE, auth._CACHE, auth._CACHE_MTIME, auth._ACCESS)
+        auth._TOKEN_DIR = tmp
+        auth._TOKEN_FILE = tmp / "antigravity_tokens.json"
+        auth._CACHE, auth._CACHE_MTIME, auth._ACCESS = None, 0, ("", 0.0)
+        auth._DIRTY = False
+
+    def tearDown(self):
+        a = self.auth
+        a._TOKEN_DIR, a._TOKEN_FILE, a._CACHE, a._CACHE_MTIME, a._ACCESS = self._saved
+        a._DIRTY = False
+        self._tmpdir.cleanup()
+
+    def test_missing_file_is_empty(self):
+        self.assertEqual(self.auth._load_stored(), {})
+
+    def test_save_then_load_roundtrip(self):
+        self.auth._save_stored({"refresh_token": "rt", "project_id": "p1"})
+        self.assertEqual(self.auth._load_stored()["refresh_token"], "rt")
+        self.assertEqual(self.auth.get_project_id(), "p1")
+
+    def test_saved_file_is_private_and_leaves_no_temp(self):
+        self.auth._save_stored({"refresh_token": "rt"})
+        self.assertEqual(self.auth._TOKEN_FILE.stat().st_mode & 0o777, 0o600)
+        self.assertEqual([p.name for p in self.auth._TOKEN_DIR.iterdir()], ["antigravity_tokens.json"])
+
+    def test_loaded_dict_is_a_copy(self):
+        self.auth._save_stored({"refresh_token": "rt"})
+        self.auth._load_stored()["refresh_token"] = "mutated"
+        self.assertEqual(self.auth._load_stored()["refresh_token"], "rt")
+
+    def test_external_rewrite_invalidates_cache(self):
+        self.auth._save_stored({"refresh_token": "old"})
+        self.auth._load_stored()
+        self.auth._TOKEN_FILE.write_text(json.dumps({"refresh_token": "new"}), encoding="utf-8")
+        st = self.auth._TOKEN_FILE.stat()
+        os.utime(self.auth._TOKEN_FILE, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        self.assertEqual(self.auth._load_stored()["refresh_token"], "new")
+
+    def test_stale_token_served_while_refreshing_in_background(self):
+        import time
+        from unittest.mock import patch
+        self.auth._save_stored({
+            "refresh_token": "rt", "access_token": "old",
+            "expires_at": time.time() + self.auth._STALE_SECONDS / 2,
+        })
+        with patch.object(self.auth, "refresh_access_token", return_value="new") as refresh:
+            self.assertEqual(self.auth.get_access_token(), "old")
+            for _ in range(100):
+                if not self.auth._REFRESH_IN_FLIGHT:
+                    break
+                time.sleep(0.01)
+        refresh.assert_called_once_with("rt")
+
+    def test_refresh_without_rotation_defers_write_until_flush(self):
+        from unittest.mock import patch
+        self.auth._save_stored({"refresh_token": "rt", "access_token": "old", "expires_at": 0})
+        mtime = self.auth._TOKEN_FILE.stat().st_mtime_ns
+        reply = {"access_token": "new", "expires_in": 3600}
+        with patch.object(self.auth, "_http_post_form", return_value=reply):
+            self.assertEqual(self.auth.refresh_access_token(), "new")
+        self.assertEqual(self.auth._TOKEN_FILE.stat().st_mtime_ns, mtime)
+        self.assertEqual(self.auth._load_stored()["access_token"], "new")
+        self.auth._flush_stored()
+        on_disk = json.loads(self.auth._TOKEN_FILE.read_text(encoding="utf-8"))
+        self.assertEqual(on_disk["access_token"], "new")
+
+    def test_concurrent_401_refreshes_share_one_call(self):
+        import threading
+        import time
+        from unittest.mock import patch
+
+        def slow_refresh():
+            time.sleep(0.05)
+            self.auth._ACCESS = ("new", time.time() + 3600)
+            return "new"
+
+        self.auth._ACCESS = ("old", time.time() + 3600)
+        results = []
+        with patch.object(self.auth, "refresh_access_token", side_effect=slow_refresh) as refresh:
+            threads = [threading.Thread(target=lambda: results.append(self.auth.refresh_rejected_token("old")))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(results, ["new"] * 8)
+        refresh.assert_called_once_with()
+
+    def test_fresh_token_served_from_memory(self):
+        import time
+        from unittest.mock import patch
+        self.auth._save_stored({
+            "refresh_token": "rt", "access_token": "tok", "expires_at": time.time() + 3600,
+        })
+        self.assertEqual(self.auth.get_access_token(), "tok")
+        with patch.object(self.auth, "_load_stored", side_effect=AssertionError("disk read")):
+            self.assertEqual(self.auth.get_access_token(), "tok")
+
+
+class _FakeResp:
+    def __init__(self, payload):
+        self.ok = payload is not None
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class _FakeSession:
+    def __init__(self, by_host):
+        self.by_host = by_host
+
+    def post(self, url, **kwargs):
+        for host, payload in self.by_host.items():
+            if url.startswith(host):
+                if isinstance(payload, Exception):
+                    raise payload
+                return _FakeResp(payload)
+        return _FakeResp(None)
+
+
+class TestLoadCodeAssist(unittest.TestCase):
+    """Test concurrent loadCodeAssist probing."""
+
+    def test_prefers_payload_with_managed_project(self):
+        from ouroboros import antigravity_auth as auth
+        eps = auth.ENDPOINTS_LOAD
+        session = _FakeSession({
+            eps[0]: {"allowedTiers": [{"id": "FREE"}]},
+            eps[1]: ConnectionError("down"),
+            eps[2]: {"cloudaicompanionProject": {"id": "managed-1"}},
+        })
+        payload = auth._load_code_assist(session, {})
+        self.assertEqual(auth._managed_project(payload), "managed-1")
+
+    def test_falls_back_to_any_ok_payload(self):
+        from ouroboros import antigravity_auth as auth
+        session = _FakeSession({auth.ENDPOINTS_LOAD[1]: {"allowedTiers": []}})
+        self.assertEqual(auth._load_code_assist(session, {}), {"allowedTiers": []})
+
+
+class TestToolConversion(unittest.TestCase):
+    """Test OpenAI → Google tool schema conversion."""
+
+    SCHEMA = {
+        "$schema": "x",
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "path": {"type": "string", "default": "."},
+            "items": {"type": "array", "items": {"type": "object", "additionalProperties": True}},
+            "mode": {"anyOf": [{"type": "string", "default": "a"}, "raw"]},
+        },
+        "required": ["path"],
+    }
+
+    def test_clean_schema_strips_unsupported_keys_at_every_level(self):
+        from ouroboros.antigravity_client import _clean_schema
+        self.assertEqual(_clean_schema(self.SCHEMA), {
+            "type": "object",
+            "properties": {
+                "path": {"type": "string"},
+                "items": {"type": "array", "items": {"type": "object"}},
+                "mode": {"anyOf": [{"type": "string"}, "raw"]},
+            },
+            "required": ["path"],
+        })
+
+    def test_clean_schema_does_not_mutate_input(self):
+        import copy
+        from ouroboros.antigravity_client import _clean_schema
+        before = copy.deepcopy(self.SCHEMA)
+        _clean_schema(self.SCHEMA)
+        self.assertEqual(self.SCHEMA, before)
+
+    def test_convert_tools_reuses_declarations_for_same_schema_object(self):
+        from ouroboros.antigravity_client import _convert_tools
+        fn = {"name": "t", "description": "d", "parameters": self.SCHEMA}
+        first = _convert_tools([{"type": "function", "function": fn}])
+        again = _convert_tools([{"type": "function", "function": fn}])
+        other = _convert_tools([{"type": "function", "function": dict(fn, name="u")}])
+        decl = first[0]["functionDeclarations"][0]
+        self.assertIs(again[0]["functionDeclarations"][0], decl)
+        self.assertEqual(decl["name"], "t")
+        self.assertEqual(other[0]["functionDeclarations"][0]["name"], "u")
+
+
+class TestMessageConversion(unittest.TestCase):
+    """Test OpenAI → Google message conversion."""
+
+    def test_tool_result_name_resolved_from_tool_call_id(self):
+        from ouroboros.antigravity_client import _openai_to_google
+        messages = [
+            {"role": "system", "content": "sys"},
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "", "tool_calls": [
+                {"id": "c1", "function": {"name": "repo_read", "arguments": '{"path": "a"}'}},
+                {"id": "c2", "function": {"name": "repo_list", "arguments": "{}"}},
+            ]},
+            {"role": "tool", "tool_call_id": "c2", "content": '["x"]'},
+            {"role": "tool", "tool_call_id": "c1", "content": "plain text"},
+            {"role": "tool", "tool_call_id": "zz", "content": "{}"},
+        ]
+        body = _openai_to_google(messages)
+        self.assertEqual(body["systemInstruction"], {"parts": [{"text": "sys"}]})
+        responses = [c["parts"][0]["functionResponse"] for c in body["contents"][2:]]
+        self.assertEqual([r["name"] for r in responses], ["repo_list", "repo_read", "zz"])
+        self.assertEqual(responses[0]["response"], {"result": ["x"]})
+        self.assertEqual(responses[1]["response"], {"result": "plain text"})
+        fc = body["contents"][1]["parts"][0]
+        self.assertEqual(fc["functionCall"], {"name": "repo_read", "args": {"path": "a"}})
+
+    def test_tool_call_args_roundtrip_without_reparse(self):
+        from ouroboros.antigravity_client import _google_to_openai_message, _openai_to_google
+        args = {"path": "a", "content": "x" * 100}
+        msg = _google_to_openai_message({"candidates": [{"content": {"parts": [
+            {"functionCall": {"name": "repo_write", "args": args}, "thoughtSignature": "sig"},
+        ]}}]})
+        tc = msg["tool_calls"][0]
+        self.assertEqual(json.loads(tc["function"]["arguments"]), args)
+        # The parsed args live in a side table, not in the (copied, persisted) dict
+        self.assertEqual(set(tc), {"id", "type", "function", "_thought_signature"})
+        fc = _openai_to_google([msg])["contents"][0]["parts"][0]
+        self.assertIs(fc["functionCall"]["args"], args)
+        self.assertEqual(fc["thoughtSignature"], "sig")
+        # Compacted arguments must win over the stashed dict
+        compacted = dict(tc, function=dict(tc["function"], arguments='{"path": "a"}'))
+        fc = _openai_to_google([dict(msg, tool_calls=[compacted])])["contents"][0]["parts"][0]
+        self.assertEqual(fc["functionCall"]["args"], {"path": "a"})
+
+    def test_plain_text_turns(self):
+        from ouroboros.antigravity_client import _openai_to_google
+        body = _openai_to_google([
+            {"role": "system", "content": "a"},
+            {"role": "user", "content": "q"},
+            {"role": "assistant", "content": "r"},
+            {"role": "system", "content": "b"},
+            {"role": "user", "content": [{"type": "text", "text": "q2"}]},
+        ])
+        self.assertEqual(body["systemInstruction"], {"parts": [{"text": "b"}]})
+        self.assertEqual(body["contents"], [
+            {"role": "user", "parts": [{"text": "q"}]},
+            {"role": "model", "parts": [{"text": "r"}]},
+            {"role": "user", "parts": [{"text": "q2"}]},
+        ])
+
+
+def _google_reply(text):
+    return {"response": {
+        "candidates": [{"content": {"parts": [{"text": text}]}}],
+        "usageMetadata": {"promptTokenCount": 3, "candidatesTokenCount": 2},
+    }}
+
+
+class _StatusOnlyResp:
+    def __init__(self, status_code, text=None):
+        self.status_code = status_code
+        self._text = text
+
+    @property
+    def text(self):
+        if self._text is None:
+            raise AssertionError("body decoded to text")
+        return self._text
+
+
+class TestEndpointError(unittest.TestCase):
+    """Test response classification in antigravity_client.py."""
+
+    def test_success_body_is_not_decoded(self):
+        from ouroboros.antigravity_client import _endpoint_error
+        self.assertIsNone(_endpoint_error(_StatusOnlyResp(200), "https://e", "m", {}))
+
+    def test_server_error_reports_body_prefix(self):
+        from ouroboros.antigravity_client import _endpoint_error
+        error = _endpoint_error(_StatusOnlyResp(503, "down " * 100), "https://e", "m", {})
+        self.assertTrue(error.startswith("503 from https://e: down"))
+        self.assertLess(len(error), 250)
+
+
+class TestForkSafety(unittest.TestCase):
+    """Forked workers must not reuse the parent's pooled connections."""
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork()")
+    def test_forked_child_gets_a_fresh_session(self):
+        from ouroboros import antigravity_auth as auth
+        from ouroboros import antigravity_client as agc
+        for mod in (agc, auth):
+            parent = mod._session()
+            pid = os.fork()
+            if pid == 0:  # child: report through the exit status only
+                os._exit(0 if mod._session() is not parent else 1)
+            _, status = os.waitpid(pid, 0)
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0, mod.__name__)
+            self.assertIs(mod._session(), parent)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "needs fork()")
+    def test_forked_child_does_not_inherit_a_held_refresh_lock(self):
+        from ouroboros import antigravity_auth as auth
+        with auth._REFRESH_LOCK:
+            pid = os.fork()
+            if pid == 0:
+                os._exit(0 if auth._REFRESH_LOCK.acquire(timeout=1) else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+class TestAsyncChat(unittest.TestCase):
+    """Test AntigravityClient.achat endpoint fallback over a mocked transport."""
+
+    def setUp(self):
+        from ouroboros import antigravity_client as agc
+        # achat records the endpoint that answered; keep that out of other tests
+        self._saved_endpoint = agc._LAST_GOOD_ENDPOINT
+        agc._LAST_GOOD_ENDPOINT = None
+
+    def tearDown(self):
+        from ouroboros import antigravity_client as agc
+        agc._LAST_GOOD_ENDPOINT = self._saved_endpoint
+
+    def test_achat_falls_back_after_rate_limit(self):
+        import asyncio
+        from unittest.mock import patch
+        import httpx
+        from ouroboros import antigravity_client as agc
+
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.host)
+            if len(seen) == 1:
+                return httpx.Response(429, text="slow down")
+            return httpx.Response(200, json=_google_reply("hi"))
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            agc._ASYNC_STATE[asyncio.get_running_loop()] = (client, asyncio.Semaphore(2))
+            try:
+                return await agc.AntigravityClient().achat(
+                    [{"role": "user", "content": "hello"}], model="gemini-2.5-flash")
+            finally:
+                await client.aclose()
+
+        with patch.object(agc, "get_access_token", return_value="tok"), \
+                patch.object(agc, "get_project_id", return_value="proj"), \
+                patch.object(agc, "_BACKOFF_BASE_SEC", 0.0):
+            msg, usage = asyncio.run(run())
+
+        self.assertEqual(msg["content"], "hi")
+        self.assertEqual(usage["total_tokens"], 5)
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(agc._endpoint_order()[0], f"https://{seen[1]}")
+
+    def test_achat_forces_token_refresh_on_401(self):
+        import asyncio
+        from unittest.mock import patch
+        import httpx
+        from ouroboros import antigravity_client as agc
+
+        def handler(request):
+            if request.headers["Authorization"] == "Bearer old":
+                return httpx.Response(401, text="expired")
+            return httpx.Response(200, json=_google_reply("ok"))
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            agc._ASYNC_STATE[asyncio.get_running_loop()] = (client, asyncio.Semaphore(2))
+            try:
+                return await agc.AntigravityClient().achat(
+                    [{"role": "user", "content": "hello"}], model="gemini-2.5-flash")
+            finally:
+                await client.aclose()
+
+        with patch.object(agc, "get_access_token", return_value="old"), \
+                patch.object(agc, "refresh_rejected_token", return_value="new") as refresh, \
+                patch.object(agc, "get_project_id", return_value="proj"):
+            msg, _usage = asyncio.run(run())
+
+        self.assertEqual(msg["content"], "ok")
+        refresh.assert_called_once_with("old")
+
+    def test_achat_reports_a_failed_token_refresh_like_chat(self):
+        import asyncio
+        from unittest.mock import patch
+        import httpx
+        import requests
+        from ouroboros import antigravity_client as agc
+
+        async def run():
+            client = httpx.AsyncClient(
+                transport=httpx.MockTransport(lambda request: httpx.Response(401, text="expired")))
+            agc._ASYNC_STATE[asyncio.get_running_loop()] = (client, asyncio.Semaphore(2))
+            try:
+                return await agc.AntigravityClient().achat(
+                    [{"role": "user", "content": "hello"}], model="gemini-2.5-flash")
+            finally:
+                await client.aclose()
+
+        with patch.object(agc, "get_access_token", return_value="old"), \
+                patch.object(agc, "refresh_rejected_token",
+                             side_effect=requests.HTTPError("400 invalid_grant")), \
+                patch.object(agc, "get_project_id", return_value="proj"):
+            with self.assertRaisesRegex(RuntimeError, "All Antigravity endpoints failed.*invalid_grant"):
+                asyncio.run(run())
+
+    def test_achat_many_keeps_order_and_isolates_failures(self):
+        import asyncio
+        from unittest.mock import patch
+        import httpx
+        from ouroboros import antigravity_client as agc
+
+        def handler(request):
+            text = json.loads(request.content)["request"]["contents"][0]["parts"][0]["text"]
+            if text == "bad":
+                return httpx.Response(400, text="nope")
+            return httpx.Response(200, json=_google_reply(text.upper()))
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            agc._ASYNC_STATE[asyncio.get_running_loop()] = (client, asyncio.Semaphore(4))
+            try:
+                calls = [{"messages": [{"role": "user", "content": t}], "model": "gemini-2.5-flash"}
+                         for t in ("a", "bad", "c")]
+                return await agc.AntigravityClient().achat_many(calls, concurrency=2)
+            finally:
+                await client.aclose()
+
+        with patch.object(agc, "get_access_token", return_value="tok"), \
+                patch.object(agc, "get_project_id", return_value="proj"), \
+                patch.object(agc, "_log_request_diag"):
+            results = asyncio.run(run())
+
+        self.assertEqual(results[0][0]["content"], "A")
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2][0]["content"], "C")
+
+    def test_achat_many_auth_failure_fails_each_call_not_the_batch(self):
+        from unittest.mock import patch
+        from ouroboros import antigravity_client as agc
+
+        calls = [{"messages": [{"role": "user", "content": t}], "model": "gemini-2.5-flash"}
+                 for t in ("a", "b")]
+        with patch.object(agc, "get_access_token", side_effect=RuntimeError("not logged in")), \
+                patch.object(agc, "get_project_id", return_value="proj"), \
+                patch.object(agc, "cached_access_token", return_value=None):
+            results = agc.AntigravityClient().chat_many(calls)
+
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+            self.assertIn("not logged in", str(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
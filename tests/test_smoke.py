@@ -143,6 +143,36 @@ def test_tool_schemas_valid(registry):
         assert "properties" in params
 
 
+def test_list_dir_caches_only_settled_directories():
+    """Listings are cached by mtime, except while the mtime is too recent to trust."""
+    import time
+    from ouroboros.tools import core
+    with tempfile.TemporaryDirectory() as tmp:
+        root = pathlib.Path(tmp).resolve()
+        (root / "d").mkdir()
+        (root / "d" / "a.txt").write_text("a")
+
+        # Racy window: a change within the same mtime tick must still show up
+        assert core._list_dir(root, "d") == ["d/a.txt"]
+        assert not any(k[1] == str(root / "d") for k in core._LS_CACHE)
+        (root / "d" / "b").mkdir()
+        assert core._list_dir(root, "d") == ["d/a.txt", "d/b/"]
+
+        # Settled: cached under the mtime, handed out as a copy
+        old_ns = time.time_ns() - 10 * core._LS_RACY_NS
+        os.utime(root / "d", ns=(old_ns, old_ns))
+        first = core._list_dir(root, "d")
+        first.append("junk")
+        assert core._list_dir(root, "d") == ["d/a.txt", "d/b/"]
+
+        # A new entry bumps the mtime, which misses the old key
+        (root / "d" / "c.txt").write_text("c")
+        assert core._list_dir(root, "d") == ["d/a.txt", "d/b/", "d/c.txt"]
+        # Same mtime as the cached listing: served from the cache
+        os.utime(root / "d", ns=(old_ns, old_ns))
+        assert core._list_dir(root, "d") == ["d/a.txt", "d/b/"]
+
+
 def test_tool_execute_basic(registry):
     """Actually execute a simple tool to verify execution works."""
     result = registry.execute("run_shell", {"cmd": "echo hello"})
@@ -242,6 +272,29 @@ def test_memory_persistence():
         assert "test persistence content" in content, "Memory should persist across instances"
 
 
+@pytest.mark.parametrize("block", [1, 3, 7, 64])
+def test_read_jsonl_tail_matches_full_read(monkeypatch, block):
+    """Reading backwards in blocks gives the same tail as splitting the whole file."""
+    import json
+    from ouroboros import memory
+    from ouroboros.memory import Memory
+    monkeypatch.setattr(memory, "_TAIL_BLOCK", block)
+    records = [{"i": i, "text": "привет ✓ 日本語" * (i % 3)} for i in range(12)]
+    body = "\n".join(json.dumps(r, ensure_ascii=False) for r in records)
+    variants = [body, body + "\n", body + "\n\n\n", "\n\n" + body + "\n \n", "", "\n\n"]
+    with tempfile.TemporaryDirectory() as tmp:
+        mem = Memory(drive_root=pathlib.Path(tmp))
+        path = mem.logs_path("events.jsonl")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for text in variants:
+            path.write_bytes(text.encode("utf-8"))
+            for n in (1, 2, 5, 12, 20):
+                expected = [json.loads(line) for line in text.strip().split("\n")[-n:] if line.strip()]
+                assert mem.read_jsonl_tail("events.jsonl", n) == expected, (repr(text[-20:]), n)
+                tail = memory._read_tail_text(path, n).strip().split("\n")[-n:]
+                assert [l for l in tail if l.strip()] == [l for l in text.strip().split("\n")[-n:] if l.strip()]
+
+
 # ── Context builder ─────────────────────────────────────────────
 
 def test_context_build_runtime_section():
@@ -257,6 +310,106 @@ def test_context_build_memory_sections():
     assert callable(_build_memory_sections)
 
 
+# ── Tool loop ───────────────────────────────────────────────────
+
+def test_stateful_call_cancelled_by_another_tasks_reset(registry):
+    """A browser call cancelled by a shared-executor reset returns an error result."""
+    from concurrent.futures import Future
+    from ouroboros.loop import _execute_with_timeout
+
+    class _ResetByOtherTask:
+        def submit(self, *args, **kwargs):
+            future = Future()
+            future.cancel()
+            return future
+
+    tc = {"id": "call_1", "function": {"name": "browse_page", "arguments": "{}"}}
+    with tempfile.TemporaryDirectory() as tmp:
+        result = _execute_with_timeout(registry, tc, pathlib.Path(tmp), 5,
+                                       stateful_executor=_ResetByOtherTask())
+    assert result["is_error"]
+    assert "cancelled" in result["result"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_forked_child_drops_stateful_executor_and_browser():
+    """Workers are forked: the sticky thread and Playwright handles stay in the parent."""
+    from ouroboros import loop
+    from ouroboros.tools import browser
+    loop._STATEFUL_EXECUTOR.submit(int).result()
+    saved = browser._browser
+    browser._browser = object()
+    try:
+        pid = os.fork()
+        if pid == 0:  # child: report through the exit status only
+            os._exit(0 if loop._STATEFUL_EXECUTOR._executor is None
+                     and browser._browser is None else 1)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        browser._browser = saved
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert loop._STATEFUL_EXECUTOR._executor is not None
+
+
+# ── Review collection ───────────────────────────────────────────
+
+def _make_review_tree(root: pathlib.Path) -> None:
+    files = {
+        "b.py": "print('b')\n", "a.md": "# A\n", "blank.txt": "  \n\n",
+        "logo.png": "not really a png", "sub/z.py": "z = 1\n", "sub/deep/y.txt": "y\n",
+        "__pycache__/c.py": "cached\n", "tail1.txt": "t1\n", "tail2.txt": "t2\n",
+    }
+    for rel, text in files.items():
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(text, encoding="utf-8")
+    (root / "link.py").symlink_to(root / "b.py")
+
+
+def test_collect_sections_batched_reads_keep_walk_order(monkeypatch):
+    """Pooled, batched reads return the same sections, in walk order, as a serial walk."""
+    from ouroboros import review
+    monkeypatch.setattr(review, "_READ_BATCH", 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        repo, drive = pathlib.Path(tmp) / "repo", pathlib.Path(tmp) / "drive"
+        _make_review_tree(repo)
+        (drive / "memory").mkdir(parents=True)
+        (drive / "memory" / "notes.md").write_text("note\n", encoding="utf-8")
+        (drive / "archive").mkdir()
+        (drive / "archive" / "old.md").write_text("old\n", encoding="utf-8")
+
+        sections, stats = review.collect_sections(repo, drive)
+
+    assert [name for name, _ in sections] == [
+        "repo/a.md", "repo/b.py", "repo/tail1.txt", "repo/tail2.txt",
+        "repo/sub/z.py", "repo/sub/deep/y.txt", "drive/memory/notes.md",
+    ]
+    assert sections[1] == ("repo/b.py", "print('b')\n")
+    assert stats == {"files": 7, "chars": sum(len(c) for _, c in sections),
+                     "truncated": 0, "dropped": 0}
+
+
+def test_collect_sections_stops_reading_once_budget_is_spent(monkeypatch):
+    """Batches after the budget is spent are counted as dropped, not read."""
+    from ouroboros import review
+    monkeypatch.setattr(review, "_READ_BATCH", 2)
+    read = []
+    real_read = review._read_text
+    monkeypatch.setattr(review, "_read_text", lambda path: read.append(path) or real_read(path))
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = pathlib.Path(tmp)
+        _make_review_tree(repo)
+        (repo / "a.md").write_text("x" * 3000, encoding="utf-8")
+
+        sections, stats = review.collect_sections(repo, repo / "missing", max_total_chars=2000)
+
+    # a.md is clipped to the budget, which is then spent
+    assert [name for name, _ in sections] == ["repo/a.md"]
+    assert stats["truncated"] == 1
+    # b.py, tail1.txt, tail2.txt, sub/z.py, sub/deep/y.txt (blank.txt does not count)
+    assert stats["dropped"] == 5
+    assert len(read) == 2  # only the first batch (a.md, b.py) was read in full
+
+
 # ── Bible invariants ─────────────────────────────────────────────
 
 def test_no_hardcoded_replies():